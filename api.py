@@ -1,10 +1,49 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import logging
+import os
+import time
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from src.assistant.graph import graph_builder
-from src.assistant.state import SummaryState
-from src.assistant.utils.x_sc import initialize_twitter_client
-app = FastAPI()
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+from src.assistant.jobs import TERMINAL_STATUSES, JobStore, WorkerPool
+from src.assistant.structured import StructuredOutputError
+from src.assistant.runs import CHECKPOINTER, graphs, pending_approval, resume_research, run_batch, run_research, shared_research
+from src.assistant.utils.http_client import close_async_client
+from src.assistant.utils.metrics import registry, trace_logger
+from src.assistant.utils.post_scheduler import PostScheduler
+from src.assistant.utils.x_sc import initialize_posting_client
+
+# Node and outbound-call logs; TRACE_SPANS=1 also logs a JSON span per node and call
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+if os.getenv("TRACE_SPANS", "0") == "1":
+    trace_logger.setLevel(logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Tweets are sent from a bounded thread pool that queues around the X rate limit
+post_scheduler = PostScheduler(initialize_posting_client, max_workers=int(os.getenv("POST_WORKERS", "4")))
+ASYNC_POST_THRESHOLD = int(os.getenv("ASYNC_POST_THRESHOLD", "10"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    report = graphs.benchmark("research", checkpointer=CHECKPOINTER)
+    logger.info(
+        "Graph 'research' compiled in %.2f ms; per-request lookup %.2f us (%.0fx faster)",
+        report["compile_ms"], report["lookup_ms"] * 1000, report["speedup"],
+    )
+    # Background research jobs; set JOB_WORKERS=0 to run workers only via `python -m src.assistant.jobs`
+    app.state.job_store = JobStore()
+    job_workers = WorkerPool(app.state.job_store, workers=int(os.getenv("JOB_WORKERS", "2")))
+    job_workers.start()
+    yield
+    job_workers.stop()
+    post_scheduler.shutdown()
+    await close_async_client()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS configuration
 app.add_middleware(
@@ -14,12 +53,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class TopicRequest(BaseModel):
+class ResearchOptions(BaseModel):
+    # Search queries per research loop, run concurrently; defaults to QUERIES_PER_LOOP or 1
+    queries_per_loop: Optional[int] = Field(default=None, ge=1, le=8)
+    # Upper bound on research loops; research may stop earlier when a loop adds little
+    max_research_loops: Optional[int] = Field(default=None, ge=1, le=6)
+    # Model per node, see MODEL_PROFILES in src/assistant/configuration.py
+    model_profile: Optional[Literal["quality", "routed", "fast"]] = None
+
+    def configurable(self) -> dict:
+        return self.model_dump(include=set(ResearchOptions.model_fields), exclude_none=True)
+
+class TopicRequest(ResearchOptions):
     topic: str
 
+class BatchRequest(ResearchOptions):
+    topics: list[str] = Field(min_length=1, max_length=100)
+    # Topics researched at once; defaults to BATCH_CONCURRENCY or 4
+    concurrency: Optional[int] = Field(default=None, ge=1, le=32)
+
 class TweetRequest(BaseModel):
     tweets: list[str]
 
+class JobRequest(ResearchOptions):
+    topic: str
+    # Answer for human_approval, or None to stop at the interrupt
+    platform: Optional[Literal["T", "L", "B", "t", "l", "b"]] = "T"
+
+class ResumeRequest(BaseModel):
+    # T: tweets, L: LinkedIn posts, B: both
+    choice: Literal["T", "L", "B", "t", "l", "b"]
+
 # Root endpoint
 @app.get("/")
 def read_root():
@@ -28,38 +92,170 @@ def read_root():
 @app.post("/generate-tweets")
 async def generate_tweets(request: TopicRequest):
     try:
-        graph = graph_builder()
-        summary_state = SummaryState(
-            research_topic=request.topic,
-            search_query='',
-            web_research_results=[],
-            sources_gathered=[],
-            research_loop_count=0,
-            running_summary=None,
-            tweets=[]
-        )
-        
         final_tweets = []
-        thread = {"configurable": {"thread_id": "1"}}
-        for event in graph.stream(summary_state, thread, stream_mode="values"):
-            print(event)
-
-            final_tweets = event['tweets']
-                
-                
-        return {"tweets": final_tweets}
+        thread_id = None
+        async for event, data in shared_research(request.topic, **request.configurable()):
+            if event == "done":
+                final_tweets = data["tweets"]
+                thread_id = data["thread_id"]
+
+        return {"tweets": final_tweets, "thread_id": thread_id}
     
+    except StructuredOutputError as e:
+        # The model's reply stayed invalid after local repair and a re-ask
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate-tweets/stream")
+async def generate_tweets_stream(request: TopicRequest):
+    """
+    Same as /generate-tweets, but pushes progress as Server-Sent Events: the run id
+    straight away, then each query, source list and summary draft (streamed as
+    "summary_token" events while it is written), then every tweet as soon as the
+    model has finished writing it, and finally a "done" event carrying the full list.
+    If the model's reply is rejected and it is asked again, a "discard" event lists
+    the tweets that were streamed from the rejected reply.
+    """
+    async def sse():
+        try:
+            async for event, data in shared_research(request.topic, stream_tokens=True, **request.configurable()):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/generate-tweets/batch")
+async def generate_tweets_batch(request: BatchRequest):
+    """
+    Generate tweets for many topics in one call. Topics are researched with
+    bounded concurrency and each topic's result is streamed as one JSON line
+    (NDJSON) as soon as it finishes, in completion order; a failed topic yields
+    an "error" line without stopping the others. A final line summarizes the batch.
+    """
+    async def ndjson():
+        start = time.perf_counter()
+        failed = 0
+        async for result in run_batch(request.topics, request.concurrency, **request.configurable()):
+            failed += result["status"] == "error"
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"batch": {"topics": len(request.topics), "failed": failed, "seconds": round(time.perf_counter() - start, 3)}}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/research")
+async def research(request: TopicRequest):
+    """
+    Run research only and stop at the human_approval interrupt; pick the
+    platform afterwards with /threads/{thread_id}/resume.
+    """
+    try:
+        async for event, data in run_research(request.topic, platform=None, **request.configurable()):
+            if event == "interrupt":
+                return data
+    except StructuredOutputError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/threads/{thread_id}/interrupt")
+async def get_interrupt(thread_id: str):
+    snapshot, _ = await pending_approval(thread_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"No run awaiting approval for thread {thread_id}")
+    return {"thread_id": thread_id, "interrupt": snapshot.interrupts[0].value}
+
+@app.post("/threads/{thread_id}/resume")
+async def resume_thread(thread_id: str, request: ResumeRequest):
+    """
+    Generate content for the chosen platform from a thread's finished research.
+    Works both for runs still paused at human_approval and for runs that were
+    already resumed, e.g. to get LinkedIn posts after /generate-tweets.
+    """
+    try:
+        async for event, data in resume_research(thread_id, request.choice):
+            if event == "done":
+                return data
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except StructuredOutputError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """
+    Queue a research run for a background worker and return its job id at once.
+    """
+    platform = request.platform.lower() if request.platform else None
+    job_id = await asyncio.to_thread(app.state.job_store.submit, request.topic, platform, request.configurable())
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(app.state.job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str, after: int = 0):
+    """
+    Stream a job's progress events as Server-Sent Events until it finishes.
+    Reconnect with ?after=<last seq> to pick up where a dropped stream left off.
+    """
+    if await asyncio.to_thread(app.state.job_store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+
+    async def sse():
+        seq = after
+        while True:
+            for item in await asyncio.to_thread(app.state.job_store.events, job_id, seq):
+                seq = item["seq"]
+                yield f"id: {seq}\nevent: {item['event']}\ndata: {json.dumps(item['data'])}\n\n"
+            job = await asyncio.to_thread(app.state.job_store.get, job_id)
+            if job["status"] in TERMINAL_STATUSES:
+                # Flush events written between the last poll and the status change
+                for item in await asyncio.to_thread(app.state.job_store.events, job_id, seq):
+                    seq = item["seq"]
+                    yield f"id: {seq}\nevent: {item['event']}\ndata: {json.dumps(item['data'])}\n\n"
+                yield f"event: {job['status']}\ndata: {json.dumps({'job_id': job_id, 'error': job['error']})}\n\n"
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.post("/post-tweets")
-async def post_tweets(request: TweetRequest):
+async def post_tweets(request: TweetRequest, response: Response):
+    """
+    Post tweets through the shared scheduler. Small batches wait for their
+    sends (tweets held back by the rate limit are reported as "deferred");
+    batches of ASYNC_POST_THRESHOLD or more return a job id straight away.
+    """
     try:
-        client, api = initialize_twitter_client()
-        results = []
-        for tweet in request.tweets:
-            response = client.create_tweet(text=tweet)
-            results.append({"tweet": tweet, "id": response.data['id']})
-        return {"status": "success", "posted": results}
+        job = post_scheduler.submit(request.tweets)
+        if len(request.tweets) >= ASYNC_POST_THRESHOLD:
+            response.status_code = 202
+            return {"status": "accepted", **job.snapshot()}
+
+        await asyncio.to_thread(job.wait)
+        snapshot = job.snapshot()
+        posted = [{"tweet": r["tweet"], "id": r["id"]} for r in snapshot["results"] if r["status"] == "posted"]
+        status = "success" if len(posted) == len(request.tweets) else "partial"
+        return {"status": status, "posted": posted, **snapshot}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/post-tweets/{job_id}")
+async def get_post_job(job_id: str):
+    job = post_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.snapshot()
+
+@app.get("/metrics")
+async def metrics():
+    # Node and outbound-call latency, tokens, cost, retries and cache hits for Prometheus
+    return Response(registry.render(), media_type="text/plain; version=0.0.4")
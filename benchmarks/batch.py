@@ -0,0 +1,74 @@
+"""
+Wall time of /generate-tweets/batch by concurrency limit, against stubbed LLM and search backends.
+
+A batch should take about ceil(topics / concurrency) times one topic's latency,
+whatever the number of topics:
+
+    python -m benchmarks.batch --topics 20 --concurrency 1 5 20
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+os.environ.setdefault("TAVILY_API", "stub")
+os.environ["LLM_CACHE"] = "0"
+# Topics repeat across concurrency levels; sharing runs between them would skew the walls
+os.environ["SINGLE_FLIGHT"] = "0"
+
+import httpx
+
+from benchmarks.servers import StubServer
+from benchmarks.stubs import install_stubs
+
+
+async def run_batch(url: str, topics: int, concurrency: int) -> dict:
+    body = {"topics": [f"batch topic {i}" for i in range(topics)], "concurrency": concurrency}
+    first = None
+    lines = []
+    async with httpx.AsyncClient(base_url=url, timeout=None) as client:
+        start = time.perf_counter()
+        async with client.stream("POST", "/generate-tweets/batch", json=body) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    lines.append(json.loads(line))
+                    first = first or time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+    results = [line for line in lines if "batch" not in line]
+    return {
+        "concurrency": concurrency,
+        "done": sum(r["status"] == "done" for r in results),
+        "first_s": first,
+        "wall_s": elapsed,
+        "topic_s": sum(r["seconds"] for r in results) / len(results),
+    }
+
+
+async def main(topics, levels, llm_latency, search_latency):
+    install_stubs(llm_latency=llm_latency, search_latency=search_latency)
+    import api
+
+    # Served over real HTTP: the in-process ASGI transport would buffer the stream
+    server = StubServer(api.app).start()
+    await run_batch(server.url, 1, 1)
+    print(f"{'concurrency':>11} {'done':>5} {'first s':>8} {'wall s':>7} {'per topic s':>12} {'ideal s':>8}")
+    for level in levels:
+        report = await run_batch(server.url, topics, level)
+        ideal = math.ceil(topics / level) * report["topic_s"]
+        print(f"{level:>11} {report['done']:>5} {report['first_s']:>8.2f} {report['wall_s']:>7.2f} "
+              f"{report['topic_s']:>12.2f} {ideal:>8.2f}")
+    server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    parser.add_argument("--search-latency", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.topics, args.concurrency, args.llm_latency, args.search_latency))
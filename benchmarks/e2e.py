@@ -0,0 +1,206 @@
+"""
+End-to-end benchmark of the API against local HTTP stand-ins for Groq, Tavily,
+X and LinkedIn (benchmarks/servers.py).
+
+The real graph_builder() graph and api.py endpoints run unchanged; only the
+service hosts are swapped, so client pools, retries, JSON repair and streaming
+are all on the measured path. Reports throughput and p50/p95/p99 per endpoint,
+then where the time went per graph node and per outbound call, from the
+/metrics instrumentation:
+
+    python -m benchmarks.e2e                             # report
+    python -m benchmarks.e2e --error-rate 0.05           # with injected 503s
+    python -m benchmarks.e2e --save                      # update the tracked baseline
+    python -m benchmarks.e2e --check --tolerance 0.25
+
+--check exits non-zero if any endpoint's p95 is more than ``tolerance`` slower,
+or its throughput more than ``tolerance`` lower, than benchmarks/e2e_baseline.json,
+or if any request failed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.servers import Fault, env, start_all, stop_all
+
+BASELINE_PATH = Path(__file__).with_name("e2e_baseline.json")
+
+TWEETS = ["Benchmark tweet one", "Benchmark tweet two", "Benchmark tweet three"]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of values, q in [0, 100]."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), round(q / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def scenarios(client) -> Dict[str, Callable[[int], Awaitable[None]]]:
+    """One request per call, keyed by endpoint."""
+    from src.assistant.utils.linkdin_sc import LinkedInShare
+
+    async def generate(i: int) -> None:
+        response = await client.post("/generate-tweets", json={"topic": f"benchmark topic {i}"})
+        response.raise_for_status()
+
+    async def stream(i: int) -> None:
+        async with client.stream("POST", "/generate-tweets/stream", json={"topic": f"benchmark stream {i}"}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line == "event: error":
+                    raise RuntimeError("stream reported an error")
+
+    async def research_and_resume(i: int) -> None:
+        response = await client.post("/research", json={"topic": f"benchmark research {i}"})
+        response.raise_for_status()
+        response = await client.post(f"/threads/{response.json()['thread_id']}/resume", json={"choice": "L"})
+        response.raise_for_status()
+
+    async def post_tweets(i: int) -> None:
+        response = await client.post("/post-tweets", json={"tweets": TWEETS})
+        response.raise_for_status()
+        if response.json()["status"] != "success":
+            raise RuntimeError(f"post-tweets: {response.json()['status']}")
+
+    linkedin = LinkedInShare("stub", person_urn="urn:li:person:stub")
+
+    async def linkedin_post(i: int) -> None:
+        result = await asyncio.to_thread(linkedin.post_text, f"Benchmark post {i}")
+        if result["status_code"] != 201:
+            raise RuntimeError(f"ugcPosts: {result['status_code']}")
+
+    return {
+        "POST /generate-tweets": generate,
+        "POST /generate-tweets/stream": stream,
+        "POST /research + /resume": research_and_resume,
+        "POST /post-tweets": post_tweets,
+        "LinkedInShare.post_text": linkedin_post,
+    }
+
+
+async def run_endpoint(call: Callable[[int], Awaitable[None]], requests: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call(i)
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def breakdown() -> None:
+    from src.assistant.utils.metrics import NODE_SECONDS, OUTBOUND_SECONDS, RETRIES
+
+    nodes = {labels[0]: totals for labels, totals in NODE_SECONDS.totals().items()}
+    grand_total = sum(total for _, total in nodes.values()) or 1.0
+    print(f"\n{'node':<20} {'runs':>6} {'mean ms':>9} {'share':>7}")
+    for node, (count, total) in sorted(nodes.items(), key=lambda item: -item[1][1]):
+        print(f"{node:<20} {count:>6} {total / count * 1000:>9.1f} {total / grand_total:>7.0%}")
+
+    print(f"\n{'outbound':<36} {'calls':>6} {'mean ms':>9}")
+    for (service, operation, outcome), (count, total) in sorted(OUTBOUND_SECONDS.totals().items()):
+        print(f"{f'{service}.{operation} ({outcome})':<36} {count:>6} {total / count * 1000:>9.1f}")
+    retries = {labels[0]: value for labels, value in RETRIES.totals().items()}
+    if retries:
+        print("retries: " + ", ".join(f"{host} {value:.0f}" for host, value in retries.items()))
+
+
+async def main(requests: int, concurrency: int, faults: Dict[str, Fault], save: bool, check: bool, tolerance: float) -> None:
+    servers = start_all(faults)
+    os.environ.update(env(servers))
+    # Measure the services, not the caches or shared runs; keep job workers out of the process
+    os.environ.update({"LLM_CACHE": "0", "TAVILY_CACHE": "0", "SINGLE_FLIGHT": "0", "JOB_WORKERS": "0", "CHECKPOINTER": "memory"})
+    try:
+        import httpx
+        import api
+
+        reports = {}
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for endpoint, call in scenarios(client).items():
+                # One untimed request first, so compile and connection setup are not counted
+                await run_endpoint(call, 1, 1)
+                reports[endpoint] = await run_endpoint(call, requests, concurrency)
+        api.post_scheduler.shutdown()
+    finally:
+        stop_all(servers)
+
+    print(f"{'endpoint':<28} {'requests':>8} {'errors':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, r in reports.items():
+        print(f"{endpoint:<28} {r['requests']:>8} {r['errors']:>6} {r['rps']:>7.2f} "
+              f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f}")
+    breakdown()
+
+    if save:
+        baseline = {endpoint: {key: round(r[key], 2) for key in ("rps", "p50_ms", "p95_ms", "p99_ms")} for endpoint, r in reports.items()}
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\nsaved baseline to {BASELINE_PATH.name}")
+    elif check:
+        if not BASELINE_PATH.exists():
+            raise SystemExit("no baseline; run with --save first")
+        baseline = json.loads(BASELINE_PATH.read_text())
+        failures = []
+        for endpoint, r in reports.items():
+            if r["errors"]:
+                failures.append(f"{endpoint}: {r['errors']} failed requests")
+            if endpoint not in baseline:
+                continue
+            base = baseline[endpoint]
+            if r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                failures.append(f"{endpoint}: p95 {r['p95_ms']:.0f} ms > {base['p95_ms'] * (1 + tolerance):.0f} ms allowed")
+            if r["rps"] < base["rps"] * (1 - tolerance):
+                failures.append(f"{endpoint}: {r['rps']:.2f} req/s < {base['rps'] * (1 - tolerance):.2f} allowed")
+        if failures:
+            raise SystemExit("regression:\n  " + "\n  ".join(failures))
+        print(f"\nok: every endpoint within {tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--search-latency", type=float, default=0.1)
+    parser.add_argument("--post-latency", type=float, default=0.05, help="X and LinkedIn latency")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, in seconds, on every service")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests each service fails")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--save", action="store_true", help="write the result as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail on errors or if slower than the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    def fault(latency: float, seed: int) -> Fault:
+        return Fault(latency=latency, jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status, seed=seed)
+
+    faults = {
+        "groq": fault(args.llm_latency, 1),
+        "tavily": fault(args.search_latency, 2),
+        "x": fault(args.post_latency, 3),
+        "linkedin": fault(args.post_latency, 4),
+    }
+    asyncio.run(main(args.requests, args.concurrency, faults, args.save, args.check, args.tolerance))
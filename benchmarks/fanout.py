@@ -0,0 +1,46 @@
+"""
+Compare research coverage and wall time for different queries_per_loop settings
+using the stub backends.
+
+Runs the research graph (up to the human_approval interrupt) once per setting
+and reports wall time, searches issued and distinct sources gathered:
+
+    python -m benchmarks.fanout --queries-per-loop 1 3 5
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+os.environ.setdefault("TAVILY_API", "stub")
+
+from benchmarks.stubs import install_stubs
+
+
+async def main(settings, topic, llm_latency, search_latency):
+    _, search_api = install_stubs(llm_latency=llm_latency, search_latency=search_latency)
+    from src.assistant.graph import graph_builder
+
+    graph = graph_builder()
+    print(f"{'queries/loop':>12} {'wall (s)':>9} {'searches':>9} {'sources':>8}")
+    for n in settings:
+        calls_before = search_api.calls
+        config = {"configurable": {"thread_id": str(uuid.uuid4()), "queries_per_loop": n}}
+        start = time.perf_counter()
+        await graph.ainvoke({"research_topic": f"{topic} ({n})"}, config)
+        elapsed = time.perf_counter() - start
+        state = (await graph.aget_state(config)).values
+        sources = {source["url"] for source in state["sources_gathered"]}
+        print(f"{n:>12} {elapsed:>9.2f} {search_api.calls - calls_before:>9} {len(sources):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries-per-loop", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--topic", default="AI in healthcare")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--search-latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.queries_per_loop, args.topic, args.llm_latency, args.search_latency))
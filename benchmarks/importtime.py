@@ -0,0 +1,97 @@
+"""
+Measure the cold import time of the graph module with ``python -X importtime``.
+
+Each run imports the module in a fresh interpreter (without credentials, as a
+LangGraph server or serverless cold start would) and the median is reported
+along with the slowest top-level imports:
+
+    python -m benchmarks.importtime                      # report
+    python -m benchmarks.importtime --save               # update the tracked baseline
+    python -m benchmarks.importtime --check --tolerance 0.25
+
+--check exits non-zero if the median is more than ``tolerance`` slower than
+benchmarks/importtime_baseline.json.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BASELINE_PATH = Path(__file__).with_name("importtime_baseline.json")
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_profile(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        Tuple[float, Dict[str, float]]: Cumulative import time of the module in ms,
+        and the cumulative time of each top-level import it triggered
+    """
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("GROQ_", "TAVILY_", "ACCESS_TOKEN", "CONSUMER_", "BEARER_"))}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    total, children = 0.0, {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nesting is shown as two spaces of indent per level
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        if depth == 0 and name == module:
+            total = int(cumulative_us) / 1000
+        elif depth == 1:
+            children[name.strip()] = int(cumulative_us) / 1000
+    return total, children
+
+
+def main(module: str, runs: int, top: int, save: bool, check: bool, tolerance: float) -> None:
+    totals: List[float] = []
+    slowest: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        total, children = import_profile(module)
+        totals.append(total)
+        for name, ms in children.items():
+            slowest.setdefault(name, []).append(ms)
+
+    median = statistics.median(totals)
+    print(f"import {module}: median {median:.0f} ms over {runs} runs (min {min(totals):.0f}, max {max(totals):.0f})")
+    ranked = sorted(((statistics.median(v), k) for k, v in slowest.items()), reverse=True)[:top]
+    for ms, name in ranked:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if save:
+        baselines[module] = {"median_ms": round(median, 1), "top": {name: round(ms, 1) for ms, name in ranked}}
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"saved baseline to {BASELINE_PATH.name}")
+    elif check:
+        if module not in baselines:
+            raise SystemExit(f"no baseline for {module}; run with --save first")
+        limit = baselines[module]["median_ms"] * (1 + tolerance)
+        if median > limit:
+            raise SystemExit(f"regression: {median:.0f} ms > {limit:.0f} ms allowed")
+        print(f"ok: within {tolerance:.0%} of the {baselines[module]['median_ms']:.0f} ms baseline")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.assistant.graph")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10, help="number of slowest top-level imports to list")
+    parser.add_argument("--save", action="store_true", help="write the result as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail if slower than the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    main(args.module, args.runs, args.top, args.save, args.check, args.tolerance)
@@ -0,0 +1,43 @@
+"""
+Measure the LLM response cache on repeat topics using the stub backends.
+
+Runs the research graph (up to the human_approval interrupt) for each topic
+twice and reports wall time per pass plus per-node hit rates:
+
+    python -m benchmarks.llm_cache --topics "AI in healthcare" "Rust adoption"
+"""
+import argparse
+import os
+import time
+import uuid
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+os.environ.setdefault("TAVILY_API", "stub")
+
+from benchmarks.stubs import install_stubs
+
+
+def main(topics, llm_latency):
+    llm, _ = install_stubs(llm_latency=llm_latency, search_latency=0)
+    if llm.cache is None:
+        raise SystemExit("LLM cache is disabled (LLM_CACHE=0)")
+    from src.assistant.graph import graph_builder
+
+    graph = graph_builder()
+    for attempt in ("cold", "warm"):
+        start = time.perf_counter()
+        for topic in topics:
+            graph.invoke({"research_topic": topic}, {"configurable": {"thread_id": str(uuid.uuid4())}})
+        print(f"{attempt}: {time.perf_counter() - start:.2f}s for {len(topics)} topics")
+
+    print(f"{'node':<20} {'hits':>5} {'similar':>8} {'misses':>7} {'hit rate':>9}")
+    for node, stats in sorted(llm.cache.stats().items()):
+        print(f"{node:<20} {stats['hits']:>5} {stats['similar_hits']:>8} {stats['misses']:>7} {stats['hit_rate']:>9.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", nargs="+", default=["AI in healthcare", "Rust adoption", "Solid-state batteries"])
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    args = parser.parse_args()
+    main(args.topics, args.llm_latency)
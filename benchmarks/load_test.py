@@ -0,0 +1,70 @@
+"""
+Load test for /generate-tweets against stubbed LLM and search backends.
+
+Runs waves of concurrent requests through the ASGI app in-process and reports
+throughput and latency per concurrency level:
+
+    python -m benchmarks.load_test --concurrency 1 10 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+os.environ.setdefault("TAVILY_API", "stub")
+# Topics repeat across levels and rounds; each request must do its own run
+os.environ["SINGLE_FLIGHT"] = "0"
+
+import httpx
+
+from benchmarks.stubs import install_stubs
+
+
+async def run_level(app, concurrency: int, rounds: int):
+    latencies = []
+
+    async def one(client, i):
+        start = time.perf_counter()
+        response = await client.post("/generate-tweets", json={"topic": f"load test topic {i}"})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        start = time.perf_counter()
+        for r in range(rounds):
+            await asyncio.gather(*(one(client, r * concurrency + i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_s": statistics.median(latencies),
+        "max_s": max(latencies),
+    }
+
+
+async def main(levels, rounds, llm_latency, search_latency):
+    install_stubs(llm_latency=llm_latency, search_latency=search_latency)
+    import api
+
+    print(f"{'concurrency':>11} {'requests':>8} {'req/s':>8} {'p50 s':>8} {'max s':>8}")
+    for level in levels:
+        report = await run_level(api.app, level, rounds)
+        print(
+            f"{report['concurrency']:>11} {report['requests']:>8} {report['throughput_rps']:>8.2f} "
+            f"{report['p50_s']:>8.2f} {report['max_s']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--rounds", type=int, default=2, help="waves of requests per concurrency level")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--search-latency", type=float, default=0.3)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.rounds, args.llm_latency, args.search_latency))
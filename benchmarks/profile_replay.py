@@ -0,0 +1,123 @@
+"""
+Profile graph orchestration, prompt building and result formatting without the network.
+
+Record the Groq and Tavily traffic of a few research runs once, then replay it
+as often as needed: replayed runs do no network I/O (unless --latency asks for
+the recorded latency), so CPU and allocation profiles show our own code
+instead of run-to-run network jitter:
+
+    python -m benchmarks.profile_replay --record            # live services, needs credentials
+    python -m benchmarks.profile_replay --record --stub     # against benchmarks/servers.py
+    python -m benchmarks.profile_replay                     # replay under cProfile
+    python -m benchmarks.profile_replay --alloc             # also the top allocation sites
+    python -m benchmarks.profile_replay --latency 1         # replay at recorded speed
+
+The cassette is a gzip-compressed JSON file with API keys scrubbed from the
+requests and no request headers at all.
+"""
+import argparse
+import asyncio
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+from pathlib import Path
+
+DEFAULT_CASSETTE = Path(__file__).with_name("research.cassette.json.gz")
+
+TOPICS = [
+    "Solid-state batteries for electric vehicles",
+    "Rust adoption in the Linux kernel",
+    "Carbon capture at cement plants",
+]
+
+
+async def research(topics, repeat: int) -> list:
+    from src.assistant.runs import run_research
+
+    seconds = []
+    for _ in range(repeat):
+        for topic in topics:
+            start = time.perf_counter()
+            async for _event, _data in run_research(topic):
+                pass
+            seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def record(cassette: Path, topics, stub: bool) -> None:
+    servers = None
+    if stub:
+        from benchmarks.servers import Fault, env, start_all
+
+        servers = start_all({"groq": Fault(latency=0.2), "tavily": Fault(latency=0.1)})
+        os.environ.update(env(servers))
+    os.environ.update({"HTTP_CASSETTE": str(cassette), "HTTP_CASSETTE_MODE": "record"})
+    from src.assistant.utils.cassette import get_cassette
+
+    try:
+        seconds = asyncio.run(research(topics, 1))
+    finally:
+        if servers:
+            from benchmarks.servers import stop_all
+
+            stop_all(servers)
+    get_cassette().save()
+    print(f"recorded {len(topics)} runs ({sum(seconds):.1f} s) to {cassette} ({cassette.stat().st_size / 1024:.1f} KiB)")
+
+
+def replay(cassette: Path, topics, repeat: int, latency: float, top: int, ours: bool, alloc: bool) -> None:
+    os.environ.update({"HTTP_CASSETTE": str(cassette), "HTTP_CASSETTE_MODE": "replay", "HTTP_CASSETTE_LATENCY": str(latency)})
+    # Credentials are only needed to build the clients; nothing is sent
+    os.environ.setdefault("GROQ_API_KEY", "replay")
+    os.environ.setdefault("TAVILY_API", "replay")
+
+    # Warm up imports, graph compilation and client setup outside the profile
+    asyncio.run(research(topics[:1], 1))
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    seconds = asyncio.run(research(topics, repeat))
+    profiler.disable()
+
+    print(f"replayed {len(seconds)} runs: mean {sum(seconds) / len(seconds) * 1000:.1f} ms, "
+          f"min {min(seconds) * 1000:.1f} ms, max {max(seconds) * 1000:.1f} ms")
+    stats = pstats.Stats(profiler).strip_dirs() if not ours else pstats.Stats(profiler)
+    stats.sort_stats("cumulative")
+    if ours:
+        # Only our modules, e.g. graph nodes, prompt building and format_llm
+        stats.print_stats(r"src[/\\]assistant", top)
+    else:
+        stats.print_stats(top)
+
+    if alloc:
+        # A separate pass, so the profiler's own allocations are not counted
+        tracemalloc.start()
+        asyncio.run(research(topics, repeat))
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        print(f"top {top} allocation sites (live at the end of the runs):")
+        for stat in snapshot.statistics("lineno")[:top]:
+            print(f"  {stat.size / 1024:8.1f} KiB {stat.count:7d} blocks  {stat.traceback[0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", type=Path, default=DEFAULT_CASSETTE)
+    parser.add_argument("--topics", nargs="+", default=TOPICS)
+    parser.add_argument("--record", action="store_true", help="record a new cassette instead of replaying")
+    parser.add_argument("--stub", action="store_true", help="record against the local stand-ins")
+    parser.add_argument("--repeat", type=int, default=5, help="replays of each topic")
+    parser.add_argument("--latency", type=float, default=0.0, help="share of the recorded latency to simulate")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--all", dest="ours", action="store_false", help="profile all modules, not only src/assistant")
+    parser.add_argument("--alloc", action="store_true", help="also trace allocations (slower)")
+    args = parser.parse_args()
+
+    # Every request must reach the transport to be recorded or replayed
+    os.environ.update({"LLM_CACHE": "0", "TAVILY_CACHE": "0"})
+    if args.record:
+        record(args.cassette, args.topics, args.stub)
+    else:
+        replay(args.cassette, args.topics, args.repeat, args.latency, args.top, args.ours, args.alloc)
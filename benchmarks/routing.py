@@ -0,0 +1,137 @@
+"""
+Compare model routing profiles end to end on a fixed topic set.
+
+Each topic is researched and turned into tweets once per profile (LLM cache
+off) and the profiles are compared on latency, tokens and output quality:
+
+    python -m benchmarks.routing --profiles quality routed
+    python -m benchmarks.routing --judge          # also grade outputs with the large model
+    python -m benchmarks.routing --stub           # offline, against the stub backends
+
+Quality is measured by cheap checks (failed runs, how many of the topic's
+terms the first query keeps, share of tweets that are non-empty and within
+280 characters) and, with --judge, a 1-10 grade of summary and tweets from
+the large model.
+"""
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import time
+
+os.environ["LLM_CACHE"] = "0"
+
+TOPICS = [
+    "Solid-state batteries for electric vehicles",
+    "Rust adoption in the Linux kernel",
+    "GLP-1 drugs and the food industry",
+    "Open-weight language models in enterprises",
+    "Carbon capture at cement plants",
+]
+
+JUDGE_PROMPT = """You grade research output for the topic: {topic}
+
+Summary:
+{summary}
+
+Tweets:
+{tweets}
+
+Rate how accurate, specific and on-topic the summary and tweets are, from 1 (poor) to 10 (excellent).
+Return a JSON object: {{"summary_score": int, "tweet_score": int}}"""
+
+
+def _terms(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]{3,}", text.lower()))
+
+
+async def run_topic(topic: str, profile: str) -> dict:
+    from src.assistant.runs import run_research
+
+    start = time.perf_counter()
+    record = {"topic": topic, "query": "", "summary": "", "tweets": [], "tokens": 0, "error": None}
+    try:
+        async for event, data in run_research(topic, model_profile=profile):
+            if event == "query" and not record["query"]:
+                record["query"] = data["query"]
+            elif event == "summary" and data["final"]:
+                record["summary"] = data["summary"]
+            elif event == "done":
+                record["tweets"] = [tweet.get("content", "") for tweet in data["tweets"]]
+                record["tokens"] = sum(c["input_tokens"] + c["output_tokens"] for c in data["token_usage"].values())
+    except Exception as e:
+        record["error"] = str(e)
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+async def judge(record: dict, model: str) -> dict:
+    from src.assistant.deps import deps
+
+    llm = deps.chat_models.get(model).with_structured_output(method="json_mode")
+    prompt = JUDGE_PROMPT.format(topic=record["topic"], summary=record["summary"], tweets="\n".join(record["tweets"]))
+    try:
+        return await llm.ainvoke(prompt)
+    except Exception:
+        return {}
+
+
+def quality(record: dict) -> dict:
+    topic_terms = _terms(record["topic"])
+    tweets = record["tweets"]
+    return {
+        "query_terms": len(topic_terms & _terms(record["query"])) / len(topic_terms) if topic_terms else 0.0,
+        "tweets_ok": sum(1 for tweet in tweets if 0 < len(tweet) <= 280) / len(tweets) if tweets else 0.0,
+    }
+
+
+async def main(profiles, topics, use_judge, stub):
+    from src.assistant.configuration import LARGE_MODEL
+
+    if stub:
+        from benchmarks.stubs import install_stubs
+
+        install_stubs(llm_latency=1.0, search_latency=0.3)
+
+    rows = []
+    for profile in profiles:
+        records = [await run_topic(topic, profile) for topic in topics]
+        ok = [r for r in records if r["error"] is None]
+        seconds = sorted(r["seconds"] for r in ok) or [0.0]
+        scores = [quality(r) for r in ok]
+        row = {
+            "profile": profile,
+            "failed": len(records) - len(ok),
+            "p50": statistics.median(seconds),
+            "max": seconds[-1],
+            "tokens": statistics.mean(r["tokens"] for r in ok) if ok else 0,
+            "query_terms": statistics.mean(s["query_terms"] for s in scores) if scores else 0,
+            "tweets_ok": statistics.mean(s["tweets_ok"] for s in scores) if scores else 0,
+        }
+        if use_judge and ok:
+            grades = [await judge(r, LARGE_MODEL) for r in ok]
+            row["summary_score"] = statistics.mean(g.get("summary_score", 0) for g in grades)
+            row["tweet_score"] = statistics.mean(g.get("tweet_score", 0) for g in grades)
+        rows.append(row)
+
+    header = f"{'profile':<9} {'failed':>6} {'p50 (s)':>8} {'max (s)':>8} {'tokens':>8} {'query terms':>12} {'tweets ok':>10}"
+    if use_judge:
+        header += f" {'summary':>8} {'tweets':>7}"
+    print(header)
+    for row in rows:
+        line = (f"{row['profile']:<9} {row['failed']:>6} {row['p50']:>8.2f} {row['max']:>8.2f} {row['tokens']:>8.0f} "
+                f"{row['query_terms']:>12.0%} {row['tweets_ok']:>10.0%}")
+        if use_judge:
+            line += f" {row.get('summary_score', 0):>8.1f} {row.get('tweet_score', 0):>7.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=["quality", "routed", "fast"])
+    parser.add_argument("--topics", nargs="+", default=TOPICS)
+    parser.add_argument("--judge", action="store_true", help="grade summaries and tweets with the large model")
+    parser.add_argument("--stub", action="store_true", help="use the stub backends instead of Groq and Tavily")
+    args = parser.parse_args()
+    asyncio.run(main(args.profiles, args.topics, args.judge, args.stub))
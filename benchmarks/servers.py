@@ -0,0 +1,287 @@
+"""
+Local HTTP stand-ins for Groq, Tavily, X and LinkedIn.
+
+Unlike the in-process stubs in benchmarks/stubs.py, these are real HTTP servers,
+so the production clients (ChatGroq, TavilySearchAPI, tweepy, LinkedInShare)
+run unchanged, with their connection pools, retries and serialization. Point
+the clients at them with the *_BASE environment variables from ``env()``.
+
+Each stand-in has its own Fault settings: a fixed latency plus jitter, and a
+share of requests answered with an error status (429 responses carry
+Retry-After and X rate-limit headers, so retry paths are exercised too).
+"""
+import asyncio
+import itertools
+import json
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.stubs import canned_reply, canned_results
+
+
+@dataclass
+class Fault:
+    """
+    Latency and error injection for one stand-in.
+
+    Attributes:
+        latency (float): Seconds before each response (spread over the chunks when streaming)
+        jitter (float): Up to this many seconds are added at random
+        error_rate (float): Share of requests answered with ``error_status``
+        error_status (int): Status of injected errors
+        seed (int): Seed of the random source, so runs are repeatable
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    seed: int = 0
+    _random: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    def delay(self) -> float:
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def error(self) -> Optional[JSONResponse]:
+        if not self.error_rate or self._random.random() >= self.error_rate:
+            return None
+        headers = {}
+        if self.error_status == 429:
+            headers = {"Retry-After": "0", "x-rate-limit-remaining": "0", "x-rate-limit-reset": str(int(time.time()) + 1)}
+        return JSONResponse({"error": {"message": "injected failure"}}, status_code=self.error_status, headers=headers)
+
+
+def _tokens(text: str) -> int:
+    # Roughly four characters per token
+    return max(1, len(text) // 4)
+
+
+def groq_app(fault: Fault, chunk_chars: int = 16) -> FastAPI:
+    """The OpenAI-compatible chat completions endpoint, with and without streaming."""
+    app = FastAPI()
+    ids = itertools.count(1)
+
+    @app.post("/openai/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        if (error := fault.error()) is not None:
+            return error
+        messages = body.get("messages", [])
+        content = canned_reply(messages[0].get("content", "") if messages else "")
+        usage = {
+            "prompt_tokens": sum(_tokens(str(m.get("content", ""))) for m in messages),
+            "completion_tokens": _tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id, model, created = f"chatcmpl-{next(ids)}", body.get("model", "stub"), int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(fault.delay())
+            return {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        chunks = [content[i:i + chunk_chars] for i in range(0, len(content), chunk_chars)]
+        delay = fault.delay() / max(len(chunks), 1)
+
+        def event(delta: Dict, finish: Optional[str] = None, **extra) -> str:
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}], **extra}
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        async def stream():
+            yield event({"role": "assistant", "content": ""})
+            for text in chunks:
+                await asyncio.sleep(delay)
+                yield event({"content": text})
+            # Groq reports usage on the last chunk
+            yield event({}, "stop", x_groq={"id": completion_id, "usage": usage})
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def tavily_app(fault: Fault, results: int = 5, shared: int = 0) -> FastAPI:
+    """Tavily's /search."""
+    app = FastAPI()
+
+    @app.post("/search")
+    async def search(request: Request):
+        body = await request.json()
+        if (error := fault.error()) is not None:
+            return error
+        delay = fault.delay()
+        await asyncio.sleep(delay)
+        query = body.get("query", "")
+        return {"query": query, "results": canned_results(query, body.get("max_results", results), shared), "response_time": delay}
+
+    return app
+
+
+def x_app(fault: Fault, limit: int = 100_000) -> FastAPI:
+    """X API v2 create_tweet, with the rate-limit headers PostScheduler reads."""
+    app = FastAPI()
+    ids = itertools.count(1)
+
+    @app.post("/2/tweets")
+    async def create_tweet(request: Request):
+        body = await request.json()
+        if (error := fault.error()) is not None:
+            return error
+        await asyncio.sleep(fault.delay())
+        tweet_id = next(ids)
+        headers = {
+            "x-rate-limit-limit": str(limit),
+            "x-rate-limit-remaining": str(max(limit - tweet_id, 0)),
+            "x-rate-limit-reset": str(int(time.time()) + 900),
+        }
+        return JSONResponse({"data": {"id": str(tweet_id), "text": body.get("text", "")}}, status_code=201, headers=headers)
+
+    return app
+
+
+def linkedin_app(fault: Fault) -> FastAPI:
+    """LinkedIn v2 userinfo, ugcPosts and assets registerUpload, plus the upload target."""
+    app = FastAPI()
+    ids = itertools.count(1)
+
+    @app.get("/v2/userinfo")
+    async def userinfo():
+        return {"sub": "stub-member"}
+
+    @app.post("/v2/ugcPosts")
+    async def ugc_posts(request: Request):
+        await request.body()
+        if (error := fault.error()) is not None:
+            return error
+        await asyncio.sleep(fault.delay())
+        return JSONResponse({}, status_code=201, headers={"X-RestLi-Id": f"urn:li:share:{next(ids)}"})
+
+    @app.post("/v2/assets")
+    async def register_upload(request: Request):
+        await request.body()
+        if (error := fault.error()) is not None:
+            return error
+        await asyncio.sleep(fault.delay())
+        asset = next(ids)
+        upload_url = f"{request.base_url}upload/{asset}"
+        return {"value": {
+            "asset": f"urn:li:digitalmediaAsset:{asset}",
+            "uploadMechanism": {"com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest": {"uploadUrl": upload_url}},
+        }}
+
+    @app.post("/upload/{asset}")
+    async def upload(asset: str, request: Request):
+        await request.body()
+        await asyncio.sleep(fault.delay())
+        return JSONResponse({}, status_code=201)
+
+    return app
+
+
+class StubServer:
+    """
+    Serves an ASGI app with uvicorn on a free local port, in a background thread.
+
+    Attributes:
+        url (str): Base URL of the running server
+    """
+
+    def __init__(self, app: FastAPI) -> None:
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self._sock.getsockname()[1]}"
+        self._server = uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False, lifespan="off"))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [self._sock]}, daemon=True)
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError(f"stub server on {self.url} failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+        self._sock.close()
+
+
+def start_all(faults: Optional[Dict[str, Fault]] = None, shared: int = 0) -> Dict[str, StubServer]:
+    """
+    Start every stand-in.
+
+    Args:
+        faults (Dict[str, Fault], optional): Settings per service ("groq", "tavily",
+            "x", "linkedin"); services left out get no latency and no errors
+        shared (int): Leading Tavily results shared by every query
+
+    Returns:
+        Dict[str, StubServer]: The running servers by service
+    """
+    faults = faults or {}
+    apps = {
+        "groq": groq_app(faults.get("groq", Fault())),
+        "tavily": tavily_app(faults.get("tavily", Fault()), shared=shared),
+        "x": x_app(faults.get("x", Fault())),
+        "linkedin": linkedin_app(faults.get("linkedin", Fault())),
+    }
+    return {name: StubServer(app).start() for name, app in apps.items()}
+
+
+def env(servers: Dict[str, StubServer]) -> Dict[str, str]:
+    """
+    Environment that points the production clients at the stand-ins, with
+    placeholder credentials.
+    """
+    return {
+        "GROQ_API_BASE": servers["groq"].url,
+        "GROQ_API_KEY": "stub",
+        "TAVILY_BASE_URL": servers["tavily"].url,
+        "TAVILY_API": "stub",
+        "X_API_BASE": servers["x"].url,
+        "LINKEDIN_BASE_URL": f"{servers['linkedin'].url}/v2",
+        **{name: "stub" for name in ("ACCESS_TOKEN", "ACCESS_TOKEN_SECRET", "CONSUMER_KEY", "CONSUMER_SECRET", "BEARER_TOKEN")},
+    }
+
+
+def stop_all(servers: Dict[str, StubServer]) -> None:
+    for server in servers.values():
+        server.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the stand-ins until interrupted and print their environment.")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--search-latency", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    running = start_all({
+        "groq": Fault(latency=args.llm_latency, error_rate=args.error_rate),
+        "tavily": Fault(latency=args.search_latency, error_rate=args.error_rate),
+    })
+    for key, value in env(running).items():
+        print(f"{key}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stop_all(running)
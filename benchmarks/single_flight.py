@@ -0,0 +1,72 @@
+"""
+A trending topic: many users submit the same topic (in different spellings) at
+once. Compares LLM calls, searches and latency with request coalescing on and off:
+
+    python -m benchmarks.single_flight --users 20
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+os.environ.setdefault("TAVILY_API", "stub")
+# Without caches, every uncoalesced request pays for its own calls
+os.environ["LLM_CACHE"] = "0"
+os.environ["TAVILY_CACHE"] = "0"
+
+import httpx
+
+from benchmarks.stubs import install_stubs
+
+SPELLINGS = ["AI agents in customer support", "ai agents in customer support", "  AI Agents in customer support!", "AI agents in Customer Support?"]
+
+
+async def wave(app, users: int, stagger: float) -> dict:
+    latencies = []
+
+    async def one(client, i):
+        await asyncio.sleep(i * stagger)
+        start = time.perf_counter()
+        response = await client.post("/generate-tweets", json={"topic": SPELLINGS[i % len(SPELLINGS)]})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(client, i) for i in range(users)))
+        elapsed = time.perf_counter() - start
+    return {"wall_s": elapsed, "max_s": max(latencies)}
+
+
+def llm_calls() -> int:
+    from src.assistant.deps import deps
+
+    return sum(model.calls for _, model in deps.chat_models)
+
+
+async def main(users, stagger, llm_latency, search_latency):
+    from src.assistant.deps import deps
+
+    install_stubs(llm_latency=llm_latency, search_latency=search_latency)
+    import api
+    from src.assistant.runs import research_flights
+
+    print(f"{'single-flight':<14} {'users':>5} {'LLM calls':>9} {'searches':>8} {'wall s':>7} {'max s':>6}")
+    for enabled in (False, True):
+        research_flights.enabled = enabled
+        before = llm_calls(), deps.search_api.calls
+        report = await wave(api.app, users, stagger)
+        calls, searches = llm_calls() - before[0], deps.search_api.calls - before[1]
+        print(f"{'on' if enabled else 'off':<14} {users:>5} {calls:>9} {searches:>8} {report['wall_s']:>7.2f} {report['max_s']:>6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--stagger", type=float, default=0.05, help="seconds between submissions")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--search-latency", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.stagger, args.llm_latency, args.search_latency))
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from src.assistant.utils.web_sc import TavilySearchAPI
+
+
+def canned_reply(system: str) -> str:
+    """Pick a response shaped like what the node behind this system prompt expects."""
+    if '"queries"' in system:
+        return json.dumps({"queries": [
+            {"query": f"stub query {i}", "aspect": f"aspect {i}", "rationale": "stub"} for i in range(5)
+        ]})
+    if '"query"' in system:
+        return json.dumps({"query": "stub query", "aspect": "overview", "rationale": "stub"})
+    if "follow_up_query" in system:
+        return json.dumps({"knowledge_gap": "stub gap", "follow_up_query": "stub follow-up"})
+    if "X_Agent" in system:
+        return json.dumps({"tweets": [
+            {"content": f"Stub tweet {i}", "virality_score": 5, "justification": "stub"} for i in range(10)
+        ]})
+    if "LinkedIn_Agent" in system:
+        return json.dumps({"posts": [
+            {"headline": f"Stub post {i}", "content": "stub", "hashtags": [], "effectiveness_score": 5,
+             "strategic_value": "stub"} for i in range(5)
+        ]})
+    return "Stub summary of the search results."
+
+
+def _canned_content(messages: List[BaseMessage]) -> str:
+    return canned_reply(messages[0].content if messages else "")
+
+
+def canned_results(query: str, results: int = 5, shared: int = 0) -> List[Dict]:
+    """
+    Tavily-shaped results for a query; the first ``shared`` are the same for
+    every query, to exercise deduplication.
+    """
+    return [
+        {
+            "url": f"https://example.com/shared/{i}" if i < shared else f"https://example.com/{abs(hash(query))}/{i}",
+            "title": f"Result {i} for {query}",
+            "score": 1.0 - i / 10,
+            "content": f"Stub content {i}." if i < shared else f"Stub content {i} about {query}.",
+        }
+        for i in range(results)
+    ]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    A chat model stand-in that sleeps for a fixed latency and returns canned JSON.
+
+    When streamed, the latency is spread evenly over chunks of ``chunk_chars``
+    characters, like tokens arriving from a real model.
+
+    Attributes:
+        latency (float): Seconds each call takes
+        calls (int): Number of completions served
+        chunk_chars (int): Characters per streamed chunk
+        model_name (str): The model this stub stands in for; part of the cache key
+    """
+
+    latency: float = 0.2
+    calls: int = 0
+    chunk_chars: int = 16
+    model_name: str = "fake"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def _message(self, messages: List[BaseMessage]) -> AIMessage:
+        content = _canned_content(messages)
+        # Roughly four characters per token, like the real usage report
+        prompt = sum(len(str(m.content)) for m in messages) // 4
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": prompt, "output_tokens": len(content) // 4, "total_tokens": prompt + len(content) // 4})
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages))])
+
+    def _chunks(self, messages: List[BaseMessage]) -> List[str]:
+        self.calls += 1
+        content = _canned_content(messages)
+        return [content[i:i + self.chunk_chars] for i in range(0, len(content), self.chunk_chars)]
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        chunks = self._chunks(messages)
+        for text in chunks:
+            time.sleep(self.latency / len(chunks))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        chunks = self._chunks(messages)
+        for text in chunks:
+            await asyncio.sleep(self.latency / len(chunks))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                await run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    def with_structured_output(self, schema=None, *, method: str = "json_mode", include_raw: bool = False, **kwargs: Any):
+        def parse(message: AIMessage) -> Dict:
+            parsed = json.loads(message.content)
+            return {"raw": message, "parsed": parsed, "parsing_error": None} if include_raw else parsed
+
+        return self | RunnableLambda(parse)
+
+
+class FakeSearchAPI(TavilySearchAPI):
+    """
+    A TavilySearchAPI stand-in that sleeps for a fixed latency and returns canned results.
+
+    Attributes:
+        latency (float): Seconds each search takes
+        shared (int): Leading results returned for every query, to exercise deduplication
+        calls (int): Number of searches served
+    """
+
+    def __init__(self, latency: float = 0.3, results: int = 5, shared: int = 0) -> None:
+        super().__init__(api_key="stub")
+        self.latency = latency
+        self.results = results
+        self.shared = shared
+        self.calls = 0
+
+    def _response(self, query: str) -> Dict:
+        self.calls += 1
+        return {"query": query, "results": canned_results(query, self.results, self.shared)}
+
+    def search(self, query: str, **kwargs: Any) -> Dict:
+        time.sleep(self.latency)
+        return self._response(query)
+
+    async def asearch(self, query: str, **kwargs: Any) -> Dict:
+        await asyncio.sleep(self.latency)
+        return self._response(query)
+
+
+def install_stubs(llm_latency: float = 0.2, search_latency: float = 0.3, small_llm_latency: Optional[float] = None):
+    """
+    Swap the graph's shared LLM and search clients in ``deps`` for the stubs above.
+
+    Every model name gets its own FakeChatModel; the small model answers in
+    ``small_llm_latency`` seconds (a quarter of ``llm_latency`` by default).
+
+    Returns:
+        tuple: The installed large-model FakeChatModel and the FakeSearchAPI
+    """
+    from src.assistant.configuration import SMALL_MODEL
+    from src.assistant.deps import ChatModels, deps
+    from src.assistant.utils.metrics import llm_metrics
+
+    if small_llm_latency is None:
+        small_llm_latency = llm_latency / 4
+
+    def fake(model: str) -> FakeChatModel:
+        latency = small_llm_latency if model == SMALL_MODEL else llm_latency
+        return FakeChatModel(latency=latency, model_name=model, cache=deps.llm_cache, callbacks=[llm_metrics])
+
+    deps.override(chat_models=ChatModels(fake), search_api=FakeSearchAPI(latency=search_latency))
+    deps.reset("llm")
+    return deps.llm, deps.search_api
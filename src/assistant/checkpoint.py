@@ -0,0 +1,121 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# Graph inputs are SummaryState dataclasses, which the checkpoint serializer must be allowed to restore
+SERDE_ALLOWLIST = [("src.assistant.state", "SummaryState")]
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    An in-memory checkpointer that keeps at most ``max_threads`` threads,
+    evicting the least recently used one when a new thread would exceed the limit.
+
+    Attributes:
+        max_threads (int): Maximum number of threads kept in memory
+    """
+
+    def __init__(self, max_threads: int = 1000, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self._threads: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _touch(self, config: RunnableConfig) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        self._threads[thread_id] = None
+        self._threads.move_to_end(thread_id)
+        while len(self._threads) > self.max_threads:
+            evicted, _ = self._threads.popitem(last=False)
+            super().delete_thread(evicted)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            checkpoint = super().get_tuple(config)
+            if checkpoint is not None:
+                self._touch(config)
+            return checkpoint
+
+    def put(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        with self._lock:
+            self._touch(config)
+            return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path="") -> None:
+        with self._lock:
+            self._touch(config)
+            super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._threads.pop(thread_id, None)
+            super().delete_thread(thread_id)
+
+
+def _threaded_sqlite_saver():
+    """Build the SQLite checkpointer class, importing the optional dependency on demand."""
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError as e:
+        raise ImportError(
+            "The sqlite checkpointer needs langgraph-checkpoint-sqlite: pip install langgraph-checkpoint-sqlite"
+        ) from e
+
+    class ThreadedSqliteSaver(SqliteSaver):
+        """
+        A SqliteSaver that also serves graph.astream by running its (locked)
+        sync methods in a worker thread, so one saver works for both paths.
+        """
+
+        async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+            return await asyncio.to_thread(self.get_tuple, config)
+
+        async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator[CheckpointTuple]:
+            items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+            for item in items:
+                yield item
+
+        async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+        async def aput_writes(self, config, writes, task_id, task_path="") -> None:
+            await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+        async def adelete_thread(self, thread_id: str) -> None:
+            await asyncio.to_thread(self.delete_thread, thread_id)
+
+    return ThreadedSqliteSaver
+
+
+def make_checkpointer(kind: Optional[str] = None) -> BaseCheckpointSaver:
+    """
+    Create the checkpointer backend for the research graph.
+
+    Args:
+        kind (str, optional): "memory" for a bounded in-process store or "sqlite"
+            for a durable file shared by every worker on the host. Defaults to the
+            CHECKPOINTER env var, or "memory"
+
+    Returns:
+        BaseCheckpointSaver: The checkpointer
+
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    kind = (kind or os.getenv("CHECKPOINTER", "memory")).lower()
+    serde = JsonPlusSerializer(allowed_msgpack_modules=SERDE_ALLOWLIST)
+    if kind == "memory":
+        return BoundedMemorySaver(max_threads=int(os.getenv("CHECKPOINT_MAX_THREADS", "1000")), serde=serde)
+    if kind == "sqlite":
+        conn = sqlite3.connect(os.getenv("CHECKPOINT_PATH", "checkpoints.sqlite"), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return _threaded_sqlite_saver()(conn, serde=serde)
+    raise ValueError("checkpointer must be 'memory' or 'sqlite'")
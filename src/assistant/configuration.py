@@ -0,0 +1,128 @@
+import os
+from dataclasses import dataclass, fields
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+LARGE_MODEL = "llama-3.3-70b-versatile"
+SMALL_MODEL = "llama-3.1-8b-instant"
+
+# Model per LLM node. Query writing and reflection only return a short JSON
+# query, so "routed" gives them the small model and keeps the large one for
+# the summary and the posts people read. Its effect on output quality is not
+# measured yet, so it is opt-in
+MODEL_PROFILES = {
+    "quality": {
+        "generate_query": LARGE_MODEL,
+        "reflect_on_summary": LARGE_MODEL,
+        "summarize_sources": LARGE_MODEL,
+        "x_agent": LARGE_MODEL,
+        "linkedin_agent": LARGE_MODEL,
+    },
+    "routed": {
+        "generate_query": SMALL_MODEL,
+        "reflect_on_summary": SMALL_MODEL,
+        "summarize_sources": LARGE_MODEL,
+        "x_agent": LARGE_MODEL,
+        "linkedin_agent": LARGE_MODEL,
+    },
+    "fast": {
+        "generate_query": SMALL_MODEL,
+        "reflect_on_summary": SMALL_MODEL,
+        "summarize_sources": SMALL_MODEL,
+        "x_agent": SMALL_MODEL,
+        "linkedin_agent": SMALL_MODEL,
+    },
+}
+
+
+@dataclass(kw_only=True)
+class Configuration:
+    """
+    Tunable settings of the research graph.
+
+    Each field can be set per run under ``config["configurable"]``, falling back
+    to the upper-cased env var of the same name and then to the default here.
+
+    Attributes:
+        queries_per_loop (int): Diverse search queries written and searched
+            concurrently in the first research loop
+        summarizer_token_budget (int): Prompt tokens for summarize_sources; the
+            running summary is trimmed to leave a quarter for search results, which
+            are ranked by score and trimmed to fit the rest
+        generator_token_budget (int): Prompt tokens for x_agent and linkedin_agent;
+            the researched content is trimmed to fit
+        max_research_loops (int): Upper bound on search/summarize/reflect cycles
+        min_novelty (float): Stop researching once a loop's new sources add a
+            smaller share of unseen terms than this
+        max_research_seconds (float): Stop starting new loops after this much
+            wall-clock time; 0 disables the limit
+        max_research_tokens (int): Stop starting new loops once research has used
+            this many LLM tokens (in + out); 0 disables the limit
+        model_profile (str): Model per node from MODEL_PROFILES: "quality" (the
+            default) or, as an opt-in per request or via MODEL_PROFILE, "routed" or "fast"
+        query_model (str): Overrides the profile for generate_query
+        reflection_model (str): Overrides the profile for reflect_on_summary
+        summarizer_model (str): Overrides the profile for summarize_sources
+        generator_model (str): Overrides the profile for x_agent and linkedin_agent
+    """
+
+    queries_per_loop: int = 1
+    summarizer_token_budget: int = 6000
+    generator_token_budget: int = 4000
+    max_research_loops: int = 2
+    min_novelty: float = 0.2
+    max_research_seconds: float = 0
+    max_research_tokens: int = 0
+    model_profile: str = "quality"
+    query_model: Optional[str] = None
+    reflection_model: Optional[str] = None
+    summarizer_model: Optional[str] = None
+    generator_model: Optional[str] = None
+
+    @classmethod
+    def from_runnable_config(cls, config: Optional[RunnableConfig] = None) -> "Configuration":
+        """
+        Create a Configuration from a RunnableConfig.
+
+        Args:
+            config (RunnableConfig, optional): The config passed to the node
+
+        Returns:
+            Configuration: The resolved settings
+        """
+        configurable = (config or {}).get("configurable", {})
+        values: dict[str, Any] = {}
+        for f in fields(cls):
+            if not f.init:
+                continue
+            value = configurable.get(f.name, os.getenv(f.name.upper()))
+            if value is not None:
+                values[f.name] = f.type(value) if isinstance(f.type, type) else value
+        return cls(**values)
+
+    def model_for(self, node: str) -> str:
+        """
+        Name of the chat model a node should call.
+
+        Args:
+            node (str): Graph node name
+
+        Returns:
+            str: The per-node override if set, else the profile's model for the node
+
+        Raises:
+            ValueError: If the profile is unknown
+        """
+        overrides = {
+            "generate_query": self.query_model,
+            "reflect_on_summary": self.reflection_model,
+            "summarize_sources": self.summarizer_model,
+            "x_agent": self.generator_model,
+            "linkedin_agent": self.generator_model,
+        }
+        if overrides.get(node):
+            return overrides[node]
+        if self.model_profile not in MODEL_PROFILES:
+            raise ValueError(f"model_profile must be one of {', '.join(MODEL_PROFILES)}")
+        return MODEL_PROFILES[self.model_profile].get(node, LARGE_MODEL)
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class Dependencies:
+    """
+    A lazy container for the clients the research graph talks to.
+
+    Nothing is constructed at import time: each dependency is built by its
+    factory on first attribute access and then shared by every caller, so
+    importing the graph stays cheap and missing credentials only fail the
+    code path that needs them.
+
+    Attributes:
+        factories (Dict[str, Callable]): Zero-argument builder for each dependency name
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]]) -> None:
+        self.factories = factories
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name: str) -> Any:
+        factories = self.__dict__.get("factories", {})
+        if name not in factories:
+            raise AttributeError(name)
+        instances = self.__dict__["_instances"]
+        if name in instances:
+            return instances[name]
+        with self._lock:
+            if name not in instances:
+                instances[name] = factories[name]()
+            return instances[name]
+
+    def override(self, **instances: Any) -> None:
+        """
+        Replace dependencies with ready-made instances, e.g. stubs for benchmarks.
+        """
+        with self._lock:
+            self._instances.update(instances)
+
+    def reset(self, *names: str) -> None:
+        """
+        Drop built instances (all of them if no names are given) so the next access rebuilds them.
+        """
+        with self._lock:
+            for name in names or list(self._instances):
+                self._instances.pop(name, None)
+
+    def built(self, name: str) -> bool:
+        """Whether a dependency has been constructed (or overridden) yet."""
+        return name in self._instances
+
+
+class ChatModels:
+    """
+    Chat model clients by model name, built on first use and shared, so that
+    routing nodes to different models does not create a client per call.
+
+    A client's async HTTP connections belong to the event loop that opened them,
+    so every event loop (the server's and each in-process job worker's) gets its
+    own clients; sync callers outside any loop share one set.
+
+    Attributes:
+        factory (Callable[[str], BaseChatModel]): Builds the client for a model name
+    """
+
+    def __init__(self, factory: Callable[[str], Any]) -> None:
+        self.factory = factory
+        self._models: Dict[str, Any] = {}
+        self._loop_models: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _for_loop(self) -> Dict[str, Any]:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._models
+        models = self._loop_models.get(loop)
+        if models is None:
+            with self._lock:
+                models = self._loop_models.setdefault(loop, {})
+        return models
+
+    def get(self, model: str) -> Any:
+        models = self._for_loop()
+        llm = models.get(model)
+        if llm is None:
+            with self._lock:
+                llm = models.get(model)
+                if llm is None:
+                    llm = models[model] = self.factory(model)
+        return llm
+
+    def __iter__(self):
+        """(model name, client) pairs for every client built so far, in any loop."""
+        with self._lock:
+            pairs = list(self._models.items())
+            for models in list(self._loop_models.values()):
+                pairs.extend(models.items())
+        return iter(pairs)
+
+
+def _llm_cache():
+    # Every node runs at temperature=0, so identical prompts are answered from the
+    # cache; set LLM_CACHE=0 to always call Groq
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return None
+    from src.assistant.utils.llm_cache import ResponseCache
+
+    ttl = os.getenv("LLM_CACHE_TTL")
+    return ResponseCache(max_entries=int(os.getenv("LLM_CACHE_SIZE", "1024")), ttl=float(ttl) if ttl else None)
+
+
+def _groq(model: str):
+    from langchain_groq import ChatGroq
+    from src.assistant.utils.cassette import CassetteTransport, get_cassette
+    from src.assistant.utils.metrics import llm_metrics
+
+    # HTTP_CASSETTE records Groq traffic to, or replays it from, a file
+    cassette_clients = {}
+    cassette = get_cassette()
+    if cassette is not None:
+        import httpx
+
+        cassette_clients = {
+            "http_client": httpx.Client(transport=CassetteTransport(cassette, httpx.HTTPTransport())),
+            "http_async_client": httpx.AsyncClient(transport=CassetteTransport(cassette, httpx.AsyncHTTPTransport())),
+        }
+    return ChatGroq(
+        model=model,
+        temperature=0,
+        max_tokens=None,
+        timeout=None,
+        max_retries=2,
+        cache=deps.llm_cache,
+        callbacks=[llm_metrics],
+        **cassette_clients,
+    )
+
+
+def _chat_models():
+    return ChatModels(_groq)
+
+
+def _llm():
+    from src.assistant.configuration import LARGE_MODEL
+
+    return deps.chat_models.get(LARGE_MODEL)
+
+
+def _search_cache():
+    # Repeated queries are served from memory; set TAVILY_CACHE_PATH to also keep
+    # results on disk across restarts, or TAVILY_CACHE=0 to always hit the API
+    if os.getenv("TAVILY_CACHE", "1") == "0":
+        return None
+    from src.assistant.utils.search_cache import SearchCache
+
+    return SearchCache(
+        max_entries=int(os.getenv("TAVILY_CACHE_SIZE", "256")),
+        ttl=float(os.getenv("TAVILY_CACHE_TTL", "3600")),
+        news_ttl=float(os.getenv("TAVILY_CACHE_NEWS_TTL", "600")),
+        path=os.getenv("TAVILY_CACHE_PATH"),
+    )
+
+
+def _search_api():
+    from src.assistant.utils.web_sc import TavilySearchAPI
+
+    api_key = os.getenv("TAVILY_API") or os.getenv("TAVILY_API_KEY")
+    if not api_key:
+        raise ValueError("TAVILY_API is missing from environment variables.")
+    return TavilySearchAPI(api_key=api_key, cache=deps.search_cache)
+
+
+def _twitter_client():
+    from src.assistant.utils.x_sc import TwitterAPIClient, TwitterAPIConfig
+
+    return TwitterAPIClient(TwitterAPIConfig()).get_client()
+
+
+def _twitter_api():
+    from src.assistant.utils.x_sc import TwitterAPIClient, TwitterAPIConfig
+
+    config = TwitterAPIConfig()
+    return TwitterAPIClient(config).v1_api(config)
+
+
+deps = Dependencies({
+    "llm_cache": _llm_cache,
+    "chat_models": _chat_models,
+    "llm": _llm,
+    "search_cache": _search_cache,
+    "search_api": _search_api,
+    "twitter_client": _twitter_client,
+    "twitter_api": _twitter_api,
+})
@@ -0,0 +1,123 @@
+from typing import Any, Dict, Iterator, List, Tuple
+
+from src.assistant.utils.json_stream import JSONArrayStream
+
+# High-volume events that are only useful live; they are not stored for replay
+TRANSIENT_EVENTS = ("summary_token",)
+
+
+def progress_events(update: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Translate one ``stream_mode="updates"`` chunk from the research graph into
+    client-facing progress events.
+
+    Args:
+        update (Dict[str, Any]): Mapping of node name to the state update it returned
+
+    Yields:
+        Tuple[str, Dict[str, Any]]: Event name and JSON-serializable payload
+    """
+    for node, output in update.items():
+        if not isinstance(output, dict):
+            # human_approval returns a Command without a state update; interrupts are handled by the caller
+            continue
+
+        if node == "generate_query":
+            yield "query", {"query": output["search_query"], "queries": output["search_queries"], "follow_up": False}
+        elif node == "reflect_on_summary":
+            yield "query", {"query": output["search_query"], "queries": output["search_queries"], "follow_up": True}
+        elif node == "web_research":
+            sources = [{"url": source.get("url"), "title": source.get("title")} for source in output["sources_gathered"]]
+            yield "sources", {"loop": output["research_loop_count"], "sources": sources}
+        elif node == "summarize_sources":
+            yield "summary", {"summary": output["running_summary"], "final": False}
+        elif node == "finalize_summary":
+            yield "summary", {"summary": output["running_summary"], "final": True}
+        elif node == "x_agent":
+            for tweet in output["tweets"]:
+                yield "tweet", tweet
+        elif node == "linkedin_agent":
+            for post in output["linkedin_posts"]:
+                yield "post", post
+
+
+class TokenStream:
+    """
+    Translate ``stream_mode="messages"`` chunks from the research graph into
+    progress events while the LLM is still generating.
+
+    Summary tokens are passed through as "summary_token" events. The JSON from
+    x_agent and linkedin_agent is parsed incrementally, one parser per LLM run,
+    and each tweet or post is emitted as soon as its object is complete.
+
+    A node may call the LLM more than once (structured.py re-asks when a reply
+    fails validation), so items streamed from a run that was superseded, or that
+    are missing from the node's validated output, are withdrawn with a
+    "discard" event ({"event": "tweet", "items": [...]}).
+    """
+
+    # Node -> (JSON field holding the array, event emitted per item)
+    ITEM_NODES = {"x_agent": ("tweets", "tweet"), "linkedin_agent": ("posts", "post")}
+
+    def __init__(self) -> None:
+        # Node -> (id of the LLM run being parsed, its parser)
+        self._runs: Dict[str, Tuple[str, JSONArrayStream]] = {}
+        # Node -> items emitted from that run and not yet matched to the node's output
+        self._streamed: Dict[str, List[Dict[str, Any]]] = {}
+
+    def feed(self, chunk: Any, metadata: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Args:
+            chunk (BaseMessageChunk): A message chunk from the graph stream
+            metadata (Dict[str, Any]): Its metadata, naming the node in ``langgraph_node``
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: Event name and JSON-serializable payload
+        """
+        text = chunk.content if isinstance(chunk.content, str) else ""
+        if not text:
+            return
+        node = metadata.get("langgraph_node")
+        if node == "summarize_sources":
+            yield "summary_token", {"text": text}
+        elif node in self.ITEM_NODES:
+            key, event = self.ITEM_NODES[node]
+            # Every chunk of one LLM call carries the id of its run
+            run_id = chunk.id or node
+            run = self._runs.get(node)
+            if run is None or run[0] != run_id:
+                # A new call from the same node replaces the reply streamed so far
+                discarded = self._streamed.pop(node, None)
+                if discarded:
+                    yield "discard", {"event": event, "items": discarded}
+                run = self._runs[node] = (run_id, JSONArrayStream(key))
+            for item in run[1].feed(text):
+                self._streamed.setdefault(node, []).append(item)
+                yield event, item
+
+    def reconcile(self, update: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Progress events for a node update, without the tweets and posts already
+        emitted from the token stream. Streamed items the node did not return
+        are withdrawn with a "discard" event first.
+
+        Items are matched on their ``content``, since the validated output may
+        fill defaults the streamed JSON left out.
+        """
+        streamed = {}
+        for node, (_, event) in self.ITEM_NODES.items():
+            if node in update:
+                self._runs.pop(node, None)
+                streamed[event] = self._streamed.pop(node, [])
+        events = []
+        for event, data in progress_events(update):
+            pending = streamed.get(event)
+            match = next((i for i, item in enumerate(pending or []) if item.get("content") == data.get("content")), None)
+            if match is None:
+                events.append((event, data))
+            else:
+                del pending[match]
+        for event, leftover in streamed.items():
+            if leftover:
+                yield "discard", {"event": event, "items": leftover}
+        yield from events
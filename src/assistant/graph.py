@@ -1,63 +1,64 @@
 from typing_extensions import Literal
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import START, END, StateGraph
-from src.assistant.state import SummaryState, SummaryStateInput, SummaryStateOutput
-from src.assistant.prompts import query_writer_instructions, summarizer_instructions, reflection_instructions, x_agent_instructions, linkedin_agent_instructions
-from langchain_groq import ChatGroq
-from src.assistant.utils.web_sc import TavilySearchAPI
-from src.assistant.utils.x_sc import initialize_twitter_client
-from dotenv import load_dotenv
+from src.assistant.state import SummaryState, SummaryStateInput, SummaryStateOutput, SearchQuery, SearchQueries, Reflection, Tweets, LinkedInPosts
+from src.assistant.structured import ainvoke_structured, invoke_structured
+from src.assistant.prompts import query_writer_instructions, multi_query_writer_instructions, summarizer_instructions, reflection_instructions, x_agent_instructions, linkedin_agent_instructions
+from src.assistant.deps import deps
+from src.assistant.configuration import Configuration
+from src.assistant.utils.source_index import SourceIndex, term_novelty
+from src.assistant.utils.context import assemble_context, count_tokens, truncate_tokens
+import asyncio
 import json
-import os
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Literal
 from langgraph.types import interrupt, Command
-from langgraph.checkpoint.memory import MemorySaver
+from src.assistant.checkpoint import make_checkpointer
+from src.assistant.utils.metrics import instrument_node
 
+logger = logging.getLogger(__name__)
 
+# The Groq model, the Tavily client and their caches live in `deps` and are
+# built on first use, so importing the graph (e.g. by the LangGraph server)
+# does no client setup and needs no credentials
 
-load_dotenv()
-os.environ['GROQ_API_KEY'] = os.getenv('GROQ_API_KEY')  
-os.environ['TAVILY_API_KEY'] = os.getenv('TAVILY_API')  
 
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-)
-
-search_api = TavilySearchAPI(api_key=os.environ['TAVILY_API_KEY'])
-
-client, api = initialize_twitter_client()
-
-
-def generate_query(state:SummaryState):
-    print(f"\033[94mRunning function: generate_query - {state.research_loop_count} \033[0m")
+def _query_messages(state: SummaryState, configurable: Configuration):
+    if configurable.queries_per_loop > 1:
+        query_writer_instructions_prompt = multi_query_writer_instructions.format(
+            research_topic=state.research_topic, number_queries=configurable.queries_per_loop)
+        return [
+            SystemMessage(content=query_writer_instructions_prompt),
+            HumanMessage(content=f"Generate {configurable.queries_per_loop} queries for web search:")]
     query_writer_instructions_prompt = query_writer_instructions.format(research_topic=state.research_topic)
-    structured_llm = llm.with_structured_output(method="json_mode", include_raw=True)
-
-    response = structured_llm.invoke([
+    return [
         SystemMessage(content=query_writer_instructions_prompt),
-        HumanMessage(content=f"Generate a query for web search:")])
-    
-
-    return {"search_query":response['parsed']['query'] }
-
-def web_search(state:SummaryState):
-    print("\033[94mRunning function: web_search\033[0m")
-    search_query = generate_query(state)['search_query']
-    result = search_api.search(query=search_query, search_depth="advanced",  max_results=5, include_images=False, include_image_descriptions=False, include_answer=False, include_raw_content=False)
-
-    result_formatted = search_api.format_llm(result)
+        HumanMessage(content=f"Generate a query for web search:")]
 
-    return {"web_research_results":[result_formatted],'sources_gathered':result['results'],'research_loop_count':state.research_loop_count+1}
+def _query_schema(configurable: Configuration):
+    # One query ({"query": ...}) or several ({"queries": [{"query": ...}, ...]}), one per aspect
+    return SearchQueries if configurable.queries_per_loop > 1 else SearchQuery
 
-
-def summarizer(state:SummaryState):
-    print("\033[94mRunning function: summarizer\033[0m")
-    existing_summary = state.running_summary
+def _query_update(payload, configurable: Configuration):
+    if isinstance(payload, SearchQueries):
+        queries = [q.query for q in payload.queries][:configurable.queries_per_loop]
+    else:
+        queries = [payload.query]
+    return {"search_query": queries[0], "search_queries": queries}
+
+def _summarizer_summary(state: SummaryState, configurable: Configuration):
+    # The fixed prompt comes off the budget first; the running summary may use what
+    # is left except a quarter of the budget kept for new results, and is truncated
+    # beyond that, so the prompt never exceeds summarizer_token_budget
+    budget = configurable.summarizer_token_budget
+    available = budget - count_tokens(summarizer_instructions) - count_tokens(state.research_topic) - PROMPT_OVERHEAD_TOKENS
+    return truncate_tokens(state.running_summary or "", available - budget // 4), max(available, 0)
+
+def _summarizer_messages(state: SummaryState, configurable: Configuration):
+    existing_summary, _ = _summarizer_summary(state, configurable)
     recent_web = state.web_research_results[-1]
 
     if existing_summary:
@@ -73,81 +74,213 @@ def summarizer(state:SummaryState):
             f"That addresses the following topic: {state.research_topic}"
         )
 
-    result = llm.invoke([
+    return [
         SystemMessage(content=summarizer_instructions),
         HumanMessage(content=human_message_content)
-    ])
-
-    return {'running_summary':result.content}
+    ]
 
-def reflection(state:SummaryState): 
-    print("\033[94mRunning function: reflection\033[0m")
-    structured_llm = llm.with_structured_output(method="json_mode", include_raw=True)
-    result = structured_llm.invoke([
-        SystemMessage(content=reflection_instructions),
+def _reflection_messages(state: SummaryState):
+    return [
+        SystemMessage(content=reflection_instructions.format(research_topic=state.research_topic)),
         HumanMessage(content=f"Indentify a knowledge gap and generate a follow-up web search query based on our existing knowledge : {state.running_summary}")
-    ])
+    ]
+
+def _generator_content(state: SummaryState, instructions: str, configurable: Configuration):
+    # The researched content is the only part of a generator prompt that grows, so it absorbs the budget
+    fixed = count_tokens(instructions) + count_tokens(state.research_topic) + PROMPT_OVERHEAD_TOKENS
+    return truncate_tokens(state.running_summary or "", configurable.generator_token_budget - fixed)
+
+def _x_messages(state: SummaryState, configurable: Configuration):
+    content = _generator_content(state, x_agent_instructions, configurable)
+    return [
+        SystemMessage(content=x_agent_instructions),
+        HumanMessage(content=f"Generate a tweets for the following topic: {state.research_topic} and the following researched Content: {content}")
+    ]
+
+def _linkedin_messages(state: SummaryState, configurable: Configuration):
+    content = _generator_content(state, linkedin_agent_instructions, configurable)
+    return [
+        SystemMessage(content=linkedin_agent_instructions),
+        HumanMessage(content=f"Generate LinkedIn posts for the following topic: {state.research_topic} and the following researched Content: {content}")
+    ]
+
+# Tokens for message framing and the fixed wording of the human messages
+PROMPT_OVERHEAD_TOKENS = 100
+
+def _token_usage(node: str, messages, message):
+    """
+    Tokens in and out of one LLM call, from the provider's usage metadata when
+    it is present and counted locally otherwise.
+    """
+    usage = getattr(message, "usage_metadata", None) or {}
+    tokens_in = usage.get("input_tokens") or sum(count_tokens(m.content) for m in messages)
+    tokens_out = usage.get("output_tokens") or count_tokens(message.content)
+    logger.debug("%s: %d tokens in, %d tokens out", node, tokens_in, tokens_out)
+    return {"token_usage": {node: {"calls": 1, "input_tokens": tokens_in, "output_tokens": tokens_out}}}
+
+SEARCH_KWARGS = dict(search_depth="advanced", max_results=5, include_images=False, include_image_descriptions=False, include_answer=False, include_raw_content=False)
+
+def _llm(node: str, configurable: Configuration):
+    # Each node can run on its own model (see MODEL_PROFILES); clients are shared per model
+    return deps.chat_models.get(configurable.model_for(node))
+
+def _search_queries(state: SummaryState):
+    # generate_query (first loop) or reflection (later loops) already wrote the queries
+    return state.search_queries or [state.search_query]
+
+def _web_search_update(state: SummaryState, results, configurable: Configuration):
+    result = deps.search_api.merge_results(results)
+    # Only sources not gathered in an earlier loop (same canonical URL or same
+    # content) reach the summarizer and the source list
+    index = SourceIndex.from_sources(state.sources_gathered)
+    result = {**result, 'results': index.filter(result['results'])}
+    # How much this loop added, for route_research to decide whether another loop pays off
+    known = [state.running_summary or ""] + [source.get('content') or "" for source in state.sources_gathered]
+    novelty = term_novelty([source.get('content') or "" for source in result['results']], known)
+    # The summarizer prompt also carries the (possibly truncated) running summary;
+    # the highest scoring results fill what is left of its budget
+    summary, available = _summarizer_summary(state, configurable)
+    context = assemble_context(result['results'], available - count_tokens(summary))
+    result_formatted = deps.search_api.format_llm({**result, 'results': context})
+    return {"web_research_results":[result_formatted],'sources_gathered':result['results'],'research_loop_count':state.research_loop_count+1,'loop_novelty':novelty}
+
+
+def generate_query(state:SummaryState, config: RunnableConfig):
+    logger.debug("Running function: generate_query - %d", state.research_loop_count)
+    started_at = time.time()
+    configurable = Configuration.from_runnable_config(config)
+    messages = _query_messages(state, configurable)
+    payload, raw = invoke_structured(_llm("generate_query", configurable), messages, _query_schema(configurable))
+
+    return {**_query_update(payload, configurable), "research_started_at": started_at, **_token_usage("generate_query", messages, raw)}
+
+async def agenerate_query(state:SummaryState, config: RunnableConfig):
+    logger.debug("Running function: generate_query - %d", state.research_loop_count)
+    started_at = time.time()
+    configurable = Configuration.from_runnable_config(config)
+    messages = _query_messages(state, configurable)
+    payload, raw = await ainvoke_structured(_llm("generate_query", configurable), messages, _query_schema(configurable))
+
+    return {**_query_update(payload, configurable), "research_started_at": started_at, **_token_usage("generate_query", messages, raw)}
+
+def web_search(state:SummaryState, config: RunnableConfig):
+    logger.debug("Running function: web_search")
+    queries = _search_queries(state)
+    if len(queries) == 1:
+        results = [deps.search_api.search(query=queries[0], **SEARCH_KWARGS)]
+    else:
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            results = list(pool.map(lambda query: deps.search_api.search(query=query, **SEARCH_KWARGS), queries))
 
-    return {"search_query":result['parsed']['follow_up_query']}
+    return _web_search_update(state, results, Configuration.from_runnable_config(config))
+
+async def aweb_search(state:SummaryState, config: RunnableConfig):
+    logger.debug("Running function: web_search")
+    results = await asyncio.gather(*(deps.search_api.asearch(query=query, **SEARCH_KWARGS) for query in _search_queries(state)))
+
+    return _web_search_update(state, list(results), Configuration.from_runnable_config(config))
+
+
+def summarizer(state:SummaryState, config: RunnableConfig):
+    logger.debug("Running function: summarizer")
+    configurable = Configuration.from_runnable_config(config)
+    messages = _summarizer_messages(state, configurable)
+    result = _llm("summarize_sources", configurable).invoke(messages)
+
+    return {'running_summary':result.content, **_token_usage("summarize_sources", messages, result)}
+
+async def asummarizer(state:SummaryState, config: RunnableConfig):
+    logger.debug("Running function: summarizer")
+    configurable = Configuration.from_runnable_config(config)
+    messages = _summarizer_messages(state, configurable)
+    result = await _llm("summarize_sources", configurable).ainvoke(messages)
+
+    return {'running_summary':result.content, **_token_usage("summarize_sources", messages, result)}
+
+def reflection(state:SummaryState, config: RunnableConfig): 
+    logger.debug("Running function: reflection")
+    messages = _reflection_messages(state)
+    result, raw = invoke_structured(_llm("reflect_on_summary", Configuration.from_runnable_config(config)), messages, Reflection)
+
+    return {"search_query":result.follow_up_query, "search_queries":[result.follow_up_query], "knowledge_gap":result.knowledge_gap, **_token_usage("reflect_on_summary", messages, raw)}
+
+async def areflection(state:SummaryState, config: RunnableConfig):
+    logger.debug("Running function: reflection")
+    messages = _reflection_messages(state)
+    result, raw = await ainvoke_structured(_llm("reflect_on_summary", Configuration.from_runnable_config(config)), messages, Reflection)
+
+    return {"search_query":result.follow_up_query, "search_queries":[result.follow_up_query], "knowledge_gap":result.knowledge_gap, **_token_usage("reflect_on_summary", messages, raw)}
 
 
 def finalize_summary(state: SummaryState):
-    print("\033[94mRunning function: finalize_summary\033[0m")
+    logger.debug("Running function: finalize_summary")
     """ Finalize the summary """
     
     # Format all accumulated sources into a single bulleted list
-    all_sources = "\n".join(source for source in [e['url'] for e in state.sources_gathered])
+    all_sources = "\n".join(source for source in [e['url'] for e in SourceIndex().filter(state.sources_gathered)])
     state.running_summary = f"## Summary\n\n{state.running_summary}\n\n ### Sources:\n{all_sources}"
-    print("\033[94mRunning function: finalize_summary\033[0m")
+    logger.debug("Running function: finalize_summary")
     return {"running_summary": state.running_summary}
 
 
-def route_research(state: SummaryState) -> Literal["finalize_summary", "web_research"]:
-    print("\033[94mRunning function: route_research\033[0m")
-    """ Route the research based on the follow-up query """
-
-    if state.research_loop_count <= 1:
+def _stop_reason(state: SummaryState, configurable: Configuration):
+    if state.research_loop_count >= configurable.max_research_loops:
+        return f"reached {configurable.max_research_loops} loops"
+    if not state.knowledge_gap or not state.search_query:
+        return "reflection found no knowledge gap"
+    if state.research_loop_count > 1 and state.loop_novelty is not None and state.loop_novelty < configurable.min_novelty:
+        return f"last loop added only {state.loop_novelty:.0%} new terms"
+    if configurable.max_research_seconds and state.research_started_at is not None:
+        elapsed = time.time() - state.research_started_at
+        if elapsed >= configurable.max_research_seconds:
+            return f"time budget spent ({elapsed:.1f}s)"
+    if configurable.max_research_tokens:
+        used = sum(counts["input_tokens"] + counts["output_tokens"] for counts in state.token_usage.values())
+        if used >= configurable.max_research_tokens:
+            return f"token budget spent ({used} tokens)"
+    return None
+
+def route_research(state: SummaryState, config: RunnableConfig) -> Literal["finalize_summary", "web_research"]:
+    logger.debug("Running function: route_research")
+    """ Route the research: run another loop only while it is likely to pay off """
+
+    reason = _stop_reason(state, Configuration.from_runnable_config(config))
+    if reason is None:
         return "web_research"
-    else:
-        return "finalize_summary" 
+    logger.info("Finishing research after %d loop(s): %s", state.research_loop_count, reason)
+    return "finalize_summary"
     
 
-def x_agent(state: SummaryState):
-    structured_llm = llm.with_structured_output(method="json_mode", include_raw=True)
-    response = structured_llm.invoke([
-        SystemMessage(content=x_agent_instructions),
-        HumanMessage(content=f"Generate a tweets for the following topic: {state.research_topic} and the following researched Content: {state.running_summary}")
-    ])
+def x_agent(state: SummaryState, config: RunnableConfig):
+    configurable = Configuration.from_runnable_config(config)
+    messages = _x_messages(state, configurable)
+    response, raw = invoke_structured(_llm("x_agent", configurable), messages, Tweets)
 
 
-    return {"tweets":response['parsed']['tweets']}
+    return {"tweets":[tweet.model_dump() for tweet in response.tweets], **_token_usage("x_agent", messages, raw)}
 
-def linkedin_agent(state: SummaryState):
-    structured_llm = llm.with_structured_output(method="json_mode", include_raw=True)
-    response = structured_llm.invoke([
-        SystemMessage(content=linkedin_agent_instructions),
-        HumanMessage(content=f"Generate LinkedIn posts for the following topic: {state.research_topic} and the following researched Content: {state.running_summary}")
-    ])
-    print(response)
+async def ax_agent(state: SummaryState, config: RunnableConfig):
+    configurable = Configuration.from_runnable_config(config)
+    messages = _x_messages(state, configurable)
+    response, raw = await ainvoke_structured(_llm("x_agent", configurable), messages, Tweets)
 
-    return {"linkedin_posts": response['parsed']['posts']}
+    return {"tweets":[tweet.model_dump() for tweet in response.tweets], **_token_usage("x_agent", messages, raw)}
 
-def linkedin_x_agent(state: SummaryState):
-    structured_llm_1 = llm.with_structured_output(method="json_mode", include_raw=True)
-    response_1 = structured_llm_1.invoke([
-        SystemMessage(content=linkedin_agent_instructions),
-        HumanMessage(content=f"Generate LinkedIn posts for the following topic: {state.research_topic} and the following researched Content: {state.running_summary}")
-    ])
-    structured_llm_2 = llm.with_structured_output(method="json_mode", include_raw=True)
-    response_2 = structured_llm_2.invoke([
-        SystemMessage(content=x_agent_instructions),
-        HumanMessage(content=f"Generate a tweets for the following topic: {state.research_topic} and the following researched Content: {state.running_summary}")
-    ])
+def linkedin_agent(state: SummaryState, config: RunnableConfig):
+    configurable = Configuration.from_runnable_config(config)
+    messages = _linkedin_messages(state, configurable)
+    response, raw = invoke_structured(_llm("linkedin_agent", configurable), messages, LinkedInPosts)
+
+    return {"linkedin_posts": [post.model_dump() for post in response.posts], **_token_usage("linkedin_agent", messages, raw)}
 
-    return {"tweets":response_2['parsed']['tweets'], "linkedin_posts": response_1['parsed']['posts']}
+async def alinkedin_agent(state: SummaryState, config: RunnableConfig):
+    configurable = Configuration.from_runnable_config(config)
+    messages = _linkedin_messages(state, configurable)
+    response, raw = await ainvoke_structured(_llm("linkedin_agent", configurable), messages, LinkedInPosts)
 
+    return {"linkedin_posts": [post.model_dump() for post in response.posts], **_token_usage("linkedin_agent", messages, raw)}
 
-def human_approval(state: SummaryState) -> Command[Literal["x_agent"]]:
+def human_approval(state: SummaryState) -> Command[Literal["x_agent", "linkedin_agent"]]:
     is_approved = interrupt(
         {
             "question": "Use For Twitter(T) or LinkedIn(L) ?",
@@ -158,27 +291,43 @@ def human_approval(state: SummaryState) -> Command[Literal["x_agent"]]:
     )
 
     if is_approved.lower() == "t":
-        print('yessss')
+        logger.debug("Approved for X")
         return Command(goto="x_agent")
     elif is_approved.lower() == "l":
-        print('nooooo')
+        logger.debug("Approved for LinkedIn")
         return Command(goto="linkedin_agent")
     else:
-        return Command(goto="linkedin_x_agent")
+        # Fan out to both generators; they run concurrently in the same step
+        # and the tweets/linkedin_posts reducers merge their outputs
+        return Command(goto=["x_agent", "linkedin_agent"])
     
-def graph_builder():    
-    checkpointer = MemorySaver()
-    print("\033[94mRunning function: graph_builder\033[0m")
+def _node(name, func, afunc):
+    # Time both implementations under the node's graph name for /metrics
+    return RunnableLambda(instrument_node(name, func), afunc=instrument_node(name, afunc))
+
+def graph_builder(checkpointer=None):
+    """
+    Build and compile the research graph.
+
+    Args:
+        checkpointer (str | BaseCheckpointSaver, optional): A saver instance, or a
+            backend name for make_checkpointer ("memory" or "sqlite"). Defaults to
+            the CHECKPOINTER env var
+    """
+    if checkpointer is None or isinstance(checkpointer, str):
+        checkpointer = make_checkpointer(checkpointer)
+    logger.debug("Running function: graph_builder")
     builder = StateGraph(SummaryState, input=SummaryStateInput, output=SummaryStateOutput )
-    builder.add_node("generate_query", generate_query)
-    builder.add_node("web_research", web_search)
-    builder.add_node("summarize_sources", summarizer)
-    builder.add_node("reflect_on_summary", reflection)
-    builder.add_node("finalize_summary", finalize_summary)
-    builder.add_node("x_agent", x_agent)
+    # Each node gets a sync and an async implementation: graph.stream runs the
+    # former, graph.astream awaits the latter without blocking the event loop
+    builder.add_node("generate_query", _node("generate_query", generate_query, agenerate_query))
+    builder.add_node("web_research", _node("web_research", web_search, aweb_search))
+    builder.add_node("summarize_sources", _node("summarize_sources", summarizer, asummarizer))
+    builder.add_node("reflect_on_summary", _node("reflect_on_summary", reflection, areflection))
+    builder.add_node("finalize_summary", instrument_node("finalize_summary", finalize_summary))
+    builder.add_node("x_agent", _node("x_agent", x_agent, ax_agent))
     builder.add_node("human_approval", human_approval)
-    builder.add_node("linkedin_agent", linkedin_agent)
-    builder.add_node("linkedin_x_agent", linkedin_x_agent)
+    builder.add_node("linkedin_agent", _node("linkedin_agent", linkedin_agent, alinkedin_agent))
 
     
 
@@ -189,7 +338,6 @@ def graph_builder():
     builder.add_conditional_edges("reflect_on_summary", route_research)
     builder.add_edge("finalize_summary", "human_approval")
     builder.add_edge("linkedin_agent", END)
-    builder.add_edge("linkedin_x_agent", END)
     builder.add_edge("x_agent", END)
     graph = builder.compile(checkpointer=checkpointer)
 
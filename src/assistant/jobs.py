@@ -0,0 +1,314 @@
+"""
+Background research jobs backed by SQLite.
+
+The API enqueues topics and returns a job id; workers claim queued jobs, run
+the research graph and append each progress event to the store, so clients can
+poll or stream a job no matter which worker runs it. Workers can live in the API
+process (JOB_WORKERS) or be scaled separately:
+
+    python -m src.assistant.jobs --workers 4 --processes
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from src.assistant.events import TRANSIENT_EVENTS
+from src.assistant.runs import run_research
+from src.assistant.utils.http_client import close_async_client
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+# Seconds a running job's lease lasts; its worker renews it every third of that,
+# and any worker requeues jobs whose lease ran out (their worker died)
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))
+
+
+class JobStore:
+    """
+    A SQLite job queue shared by the API and any number of worker processes.
+
+    Every call opens its own connection, so a store can be used from any thread
+    or process that can reach the file.
+
+    Attributes:
+        path (str): The SQLite database file
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.getenv("JOB_STORE_PATH", "jobs.sqlite")
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, topic TEXT NOT NULL, platform TEXT, status TEXT NOT NULL, "
+                "worker TEXT, result TEXT, error TEXT, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, options TEXT, heartbeat_at REAL)"
+            )
+            # Stores created before jobs took research options or leases
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("options", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                "job_id TEXT NOT NULL, seq INTEGER NOT NULL, event TEXT NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (job_id, seq))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self, topic: str, platform: Optional[str] = "t", options: Optional[Dict] = None) -> str:
+        """
+        Queue a research run.
+
+        Args:
+            topic (str): The research topic
+            platform (str, optional): Answer for human_approval ("t", "l", "b"),
+                or None to stop at the interrupt. Defaults to "t"
+            options (Dict, optional): Configuration overrides for the run, e.g.
+                {"queries_per_loop": 3}. Defaults to None
+
+        Returns:
+            str: The job id
+        """
+        job_id = str(uuid.uuid4())
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, topic, platform, status, created_at, options) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, topic, platform, time.time(), json.dumps(options) if options else None),
+            )
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """
+        Atomically take the oldest queued job.
+
+        Args:
+            worker (str): Name of the claiming worker
+
+        Returns:
+            Dict: The claimed job, or None if the queue is empty
+        """
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ? WHERE id = ?",
+                (worker, now, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+            return {**dict(row), "status": "running", "worker": worker, "started_at": now, "heartbeat_at": now}
+
+    def add_event(self, job_id: str, event: str, data: Dict) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO job_events (job_id, seq, event, data) "
+                "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ? FROM job_events WHERE job_id = ?",
+                (job_id, event, json.dumps(data), job_id),
+            )
+
+    def finish(self, job_id: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        """
+        Mark a job as succeeded with its result, or failed with an error.
+        """
+        status = "failed" if error is not None else "succeeded"
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["options"] = json.loads(job["options"]) if job["options"] else {}
+        return job
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict]:
+        """
+        Returns:
+            List[Dict]: Progress events of a job with a sequence number greater than ``after``
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT seq, event, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after),
+            ).fetchall()
+        return [{"seq": row["seq"], "event": row["event"], "data": json.loads(row["data"])} for row in rows]
+
+    def heartbeat(self, job_id: str, worker: str) -> None:
+        """
+        Renew the lease of a job the worker is still running.
+        """
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), job_id, worker),
+            )
+
+    def requeue_stale(self, lease: float) -> int:
+        """
+        Put back jobs whose worker died mid-run, i.e. whose lease was not renewed in time.
+
+        Args:
+            lease (float): Seconds since the last heartbeat after which a job is considered lost
+
+        Returns:
+            int: Number of jobs requeued
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, started_at = NULL, heartbeat_at = NULL "
+                "WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?",
+                (time.time() - lease,),
+            )
+            return cursor.rowcount
+
+
+async def _keep_alive(store: JobStore, job: Dict, lease: float) -> None:
+    while True:
+        await asyncio.sleep(lease / 3)
+        await asyncio.to_thread(store.heartbeat, job["id"], job["worker"])
+
+
+async def execute_job(store: JobStore, job: Dict, lease: float = JOB_LEASE) -> None:
+    """
+    Run one claimed job, recording each progress event and the final result,
+    and renewing the job's lease until it finishes.
+    """
+    result = None
+    options = json.loads(job["options"]) if job.get("options") else {}
+    keep_alive = asyncio.create_task(_keep_alive(store, job, lease))
+    try:
+        async for event, data in run_research(job["topic"], platform=job["platform"], stream_tokens=True, **options):
+            if event in TRANSIENT_EVENTS:
+                continue
+            store.add_event(job["id"], event, data)
+            if event in ("done", "interrupt"):
+                result = data
+        store.finish(job["id"], result=result)
+    except Exception as e:
+        store.finish(job["id"], error=str(e))
+    finally:
+        keep_alive.cancel()
+
+
+def worker_loop(store_path: str, name: str, stop: threading.Event, poll_interval: float = 0.5, lease: float = JOB_LEASE) -> None:
+    """
+    Claim and run jobs until ``stop`` is set. Each worker keeps one event loop
+    for its lifetime so pooled HTTP connections are reused across jobs.
+
+    Between jobs the worker also requeues jobs whose lease expired, so work
+    left behind by a crashed worker is picked up without a restart.
+    """
+    store = JobStore(store_path)
+
+    async def main():
+        next_sweep = 0.0
+        try:
+            while not stop.is_set():
+                if time.monotonic() >= next_sweep:
+                    requeued = store.requeue_stale(lease)
+                    if requeued:
+                        logger.warning("Requeued %d jobs whose worker stopped renewing the lease", requeued)
+                    next_sweep = time.monotonic() + lease / 2
+                job = store.claim(name)
+                if job is None:
+                    await asyncio.sleep(poll_interval)
+                    continue
+                await execute_job(store, job, lease)
+        finally:
+            await close_async_client()
+
+    asyncio.run(main())
+
+
+class WorkerPool:
+    """
+    A pool of job workers running in threads or in separate processes.
+
+    Thread workers each run their own event loop; the clients they use (chat
+    models, the async HTTP client) are kept per loop, so no connection is
+    shared with the server's loop.
+
+    Attributes:
+        store (JobStore): The queue the workers read from
+        workers (int): Number of workers
+        processes (bool): Run each worker in its own process instead of a thread
+        lease (float): Seconds a running job's lease lasts without a heartbeat
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 2,
+        processes: bool = False,
+        poll_interval: float = 0.5,
+        lease: float = JOB_LEASE,
+    ) -> None:
+        self.store = store
+        self.workers = workers
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._stop = multiprocessing.Event() if processes else threading.Event()
+        self._handles = []
+
+    def start(self) -> None:
+        prefix = f"{socket.gethostname()}-{os.getpid()}"
+        for i in range(self.workers):
+            args = (self.store.path, f"{prefix}-{i}", self._stop, self.poll_interval, self.lease)
+            if self.processes:
+                handle = multiprocessing.Process(target=worker_loop, args=args, daemon=True)
+            else:
+                handle = threading.Thread(target=worker_loop, args=args, name=f"job-worker-{i}", daemon=True)
+            handle.start()
+            self._handles.append(handle)
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        for handle in self._handles:
+            handle.join(timeout)
+        self._handles = []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--processes", action="store_true", help="run each worker in its own process")
+    parser.add_argument("--store", default=None, help="SQLite job store (default: JOB_STORE_PATH or jobs.sqlite)")
+    parser.add_argument("--lease", type=float, default=JOB_LEASE, help="requeue running jobs whose heartbeat is older than this")
+    args = parser.parse_args()
+
+    pool = WorkerPool(JobStore(args.store), workers=args.workers, processes=args.processes, lease=args.lease)
+    pool.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
@@ -13,6 +13,27 @@ Return your query as a JSON object:
 }}
 """
 
+multi_query_writer_instructions="""Your goal is to generate {number_queries} targeted web search queries.
+
+The queries will gather information related to a specific topic. Each query
+should cover a different aspect of the topic so that together they give broad
+coverage without overlapping.
+
+Topic:
+{research_topic}
+
+Return your queries as a JSON object:
+{{
+    "queries": [
+        {{
+            "query": "string",
+            "aspect": "string",
+            "rationale": "string"
+        }}
+    ]
+}}
+"""
+
 summarizer_instructions="""Your goal is to generate a high-quality summary of the web search results.
 
 When EXTENDING an existing summary:
@@ -276,6 +297,9 @@ Your tasks:
 
 Ensure the follow-up question is self-contained and includes necessary context for web search.
 
+If the summary already covers the topic well enough that another search would add
+little, return an empty string for both "knowledge_gap" and "follow_up_query".
+
 Return your analysis as a JSON object:
 {{ 
     "knowledge_gap": "string",
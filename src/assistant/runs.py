@@ -0,0 +1,205 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import List, Optional
+from langgraph.types import Command
+from src.assistant.events import TokenStream, progress_events
+from src.assistant.registry import GraphRegistry
+from src.assistant.state import SummaryState
+from src.assistant.utils.single_flight import SingleFlight, normalize_topic
+from src.assistant.utils.source_index import SourceIndex
+
+# Compiled graphs shared by everything that runs research in this process
+graphs = GraphRegistry()
+# "memory" keeps a bounded LRU of threads per process; "sqlite" lets any worker
+# (or a restarted one) pick up a thread paused at human_approval
+CHECKPOINTER = os.getenv("CHECKPOINTER", "memory")
+# Topics of a batch researched at the same time, unless the request sets its own limit
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+# Identical research requests (same normalized topic and options) arriving while
+# one runs, or up to SINGLE_FLIGHT_WINDOW seconds after it finished, share its run
+research_flights = SingleFlight(
+    window=float(os.getenv("SINGLE_FLIGHT_WINDOW", "10")),
+    enabled=os.getenv("SINGLE_FLIGHT", "1") != "0",
+)
+
+async def _graph_events(graph, graph_input, config, stream_tokens: bool):
+    """
+    Stream a graph run as progress events: one batch per finished node and,
+    with stream_tokens, summary tokens and each tweet/post as the LLM writes it.
+    """
+    if not stream_tokens:
+        async for update in graph.astream(graph_input, config, stream_mode="updates"):
+            for event, data in progress_events(update):
+                yield event, data
+        return
+
+    tokens = TokenStream()
+    async for mode, chunk in graph.astream(graph_input, config, stream_mode=["updates", "messages"]):
+        if mode == "messages":
+            message, metadata = chunk
+            for event, data in tokens.feed(message, metadata):
+                yield event, data
+        else:
+            for event, data in tokens.reconcile(chunk):
+                yield event, data
+
+async def run_research(topic: str, platform: Optional[str] = "t", stream_tokens: bool = False, **configurable):
+    """
+    Run the research graph for a topic and yield progress events as each node finishes.
+
+    With stream_tokens, the summary is also streamed token by token
+    ("summary_token" events) and tweets/posts are emitted one by one while the
+    generator is still writing the rest.
+
+    Keyword arguments override fields of Configuration for this run only, e.g.
+    queries_per_loop=3.
+
+    The graph pauses at human_approval to ask which platform to write for. The
+    tweet endpoints answer "T" straight away so only x_agent runs after research;
+    with platform=None the run stops at the interrupt and can be resumed later
+    through /threads/{thread_id}/resume.
+    """
+    graph = graphs.get("research", checkpointer=CHECKPOINTER)
+    summary_state = SummaryState(
+        research_topic=topic,
+        search_query='',
+        web_research_results=[],
+        sources_gathered=[],
+        research_loop_count=0,
+        running_summary=None,
+        tweets=[]
+    )
+    # The compiled graph and its checkpointer are shared, so every run needs its own thread
+    thread_id = str(uuid.uuid4())
+    thread = {"configurable": {**configurable, "thread_id": thread_id}}
+    yield "run", {"thread_id": thread_id, "topic": topic}
+
+    async for event, data in _graph_events(graph, summary_state, thread, stream_tokens):
+        yield event, data
+
+    if platform is None:
+        snapshot = await graph.aget_state(thread)
+        yield "interrupt", {"thread_id": thread_id, "interrupt": snapshot.interrupts[0].value}
+        return
+
+    async for event, data in resume_research(thread_id, platform, stream_tokens=stream_tokens):
+        yield event, data
+
+def shared_research(topic: str, platform: Optional[str] = "t", stream_tokens: bool = False, **configurable):
+    """
+    run_research, coalesced with identical requests in flight.
+
+    Requests are identical when their topics match after normalize_topic and
+    the platform, stream_tokens and configuration overrides are equal. Later
+    callers get the first caller's events from the start, including its
+    thread_id, so the graph, its LLM calls and its searches run once.
+    """
+    key = (normalize_topic(topic), platform, stream_tokens, tuple(sorted(configurable.items())))
+    return research_flights.stream(key, lambda: run_research(topic, platform=platform, stream_tokens=stream_tokens, **configurable))
+
+async def pending_approval(thread_id: str):
+    """
+    Find the checkpoint where a thread paused at human_approval.
+
+    If the thread was already resumed, the latest such checkpoint in its history
+    is returned instead, so another platform can be generated from the same research.
+
+    Returns:
+        tuple: (StateSnapshot, bool) - the paused checkpoint and whether it was
+        already resumed, or (None, False) if the thread never reached human_approval
+    """
+    graph = graphs.get("research", checkpointer=CHECKPOINTER)
+    thread = {"configurable": {"thread_id": thread_id}}
+    snapshot = await graph.aget_state(thread)
+    if snapshot.next == ("human_approval",) and snapshot.interrupts:
+        return snapshot, False
+    async for snapshot in graph.aget_state_history(thread):
+        if snapshot.next == ("human_approval",) and snapshot.interrupts:
+            return snapshot, True
+    return None, False
+
+async def resume_research(thread_id: str, choice: str, stream_tokens: bool = False):
+    """
+    Answer the human_approval interrupt of a thread and yield the generator's output.
+
+    Only the chosen generator node(s) run; the finished research summary is reused.
+
+    Raises:
+        LookupError: If the thread has no run paused at human_approval
+    """
+    snapshot, resumed = await pending_approval(thread_id)
+    if snapshot is None:
+        raise LookupError(f"No run awaiting approval for thread {thread_id}")
+
+    graph = graphs.get("research", checkpointer=CHECKPOINTER)
+    config = snapshot.config
+    if resumed:
+        # The old checkpoint still holds the earlier answer; branch off a fresh
+        # copy of it so human_approval asks again and takes the new choice
+        config = await graph.aupdate_state(snapshot.config, None, as_node="finalize_summary")
+
+    async for event, data in _graph_events(graph, Command(resume=choice), config, stream_tokens):
+        yield event, data
+
+    # The validated node output, whether or not the items were streamed as the
+    # model wrote them (streamed items are raw JSON and may lack defaults)
+    state = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+    yield "done", {
+        "thread_id": thread_id,
+        "tweets": state.values.get("tweets", []),
+        "linkedin_posts": state.values.get("linkedin_posts", []),
+        "token_usage": state.values.get("token_usage", {}),
+    }
+
+async def run_batch(topics: List[str], concurrency: Optional[int] = None, platform: Optional[str] = "t", **configurable):
+    """
+    Research many topics with bounded concurrency and yield each topic's result as it finishes.
+
+    At most ``concurrency`` graphs run at once, so the batch takes about
+    len(topics) / concurrency times as long as one topic. All runs share the
+    process-wide compiled graph, search cache and connection pools. Sources are
+    still deduplicated per topic; a batch-wide SourceIndex counts how many of a
+    topic's sources another topic of the batch had already gathered, which
+    points at overlapping topics. Duplicate topics, in this batch or in other
+    requests, share one run (see shared_research).
+
+    Keyword arguments override fields of Configuration for every run, as in run_research.
+
+    Yields:
+        dict: Per topic, in completion order: its position in ``topics``, the
+        topic, status ("done" or "error"), thread_id, tweets, linkedin_posts,
+        token_usage, sources, shared_sources and seconds, or error
+    """
+    semaphore = asyncio.Semaphore(concurrency or BATCH_CONCURRENCY)
+    batch_index = SourceIndex()
+    finished: asyncio.Queue = asyncio.Queue()
+    graph = graphs.get("research", checkpointer=CHECKPOINTER)
+
+    async def research(position: int, topic: str) -> None:
+        result = {"index": position, "topic": topic}
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async for event, data in shared_research(topic, platform=platform, **configurable):
+                    if event == "run":
+                        result["thread_id"] = data["thread_id"]
+                    elif event in ("done", "interrupt"):
+                        result.update(data)
+                state = await graph.aget_state({"configurable": {"thread_id": result["thread_id"]}})
+                sources = state.values.get("sources_gathered", [])
+                result.update(status="done", sources=len(sources), shared_sources=len(sources) - len(batch_index.filter(sources)))
+            except Exception as e:
+                result.update(status="error", error=str(e))
+            result["seconds"] = round(time.perf_counter() - start, 3)
+        await finished.put(result)
+
+    tasks = [asyncio.create_task(research(position, topic)) for position, topic in enumerate(topics)]
+    try:
+        for _ in tasks:
+            yield await finished.get()
+    finally:
+        # The consumer went away (e.g. the client disconnected): stop the rest of the batch
+        for task in tasks:
+            task.cancel()
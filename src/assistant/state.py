@@ -1,17 +1,34 @@
 import operator
+import re
 from dataclasses import dataclass, field
 from typing_extensions import TypedDict, Annotated
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+def add_token_usage(left: dict, right: dict) -> dict:
+    """Sum per-node token counts, so nodes running in the same step can both report usage."""
+    merged = {node: dict(counts) for node, counts in (left or {}).items()}
+    for node, counts in (right or {}).items():
+        totals = merged.setdefault(node, {})
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+    return merged
 
 @dataclass(kw_only=True)
 class SummaryState:
     research_topic: str = field(default=None) # Report topic     
     search_query: str = field(default=None) # Search query
+    search_queries: list = field(default_factory=list) # Queries searched concurrently in this loop
     web_research_results: Annotated[list, operator.add] = field(default_factory=list) 
     sources_gathered: Annotated[list, operator.add] = field(default_factory=list) 
     research_loop_count: int = field(default=0) # Research loop count
+    research_started_at: float = field(default=None) # Epoch seconds when query generation started
+    loop_novelty: float = field(default=None) # Share of new terms in the latest loop's sources
+    knowledge_gap: str = field(default=None) # Gap reported by the latest reflection, empty if none
     running_summary: str = field(default=None) # Final report
     tweets : Annotated[list, operator.add] = field(default_factory=list)
     linkedin_posts : Annotated[list, operator.add] = field(default_factory=list)
+    token_usage: Annotated[dict, add_token_usage] = field(default_factory=dict) # Tokens in/out per LLM node
 @dataclass(kw_only=True)
 class SummaryStateInput:
     research_topic: str = field(default=None) # Report topic     
@@ -20,4 +37,62 @@ class SummaryStateInput:
 class SummaryStateOutput:
     running_summary: str = field(default=None) # Final report
     tweets : Annotated[list, operator.add] = field(default_factory=list)
-    linkedin_posts : Annotated[list, operator.add] = field(default_factory=list)
\ No newline at end of file
+    linkedin_posts : Annotated[list, operator.add] = field(default_factory=list)
+    token_usage: Annotated[dict, add_token_usage] = field(default_factory=dict)
+
+
+# Payloads the LLM nodes ask for in JSON mode. Replies are validated against
+# these (after local repair) before they reach the state; extra keys are kept.
+
+class SearchQuery(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    query: str = Field(min_length=1)
+    aspect: str = ""
+    rationale: str = ""
+
+class SearchQueries(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    queries: List[SearchQuery] = Field(min_length=1)
+
+class Reflection(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    # Both are empty when the summary needs no further research
+    knowledge_gap: str = ""
+    follow_up_query: str = ""
+
+def _lenient_score(value):
+    """
+    Read a score the model may have written as text ("8", "8/10", "8.5 out of 10");
+    scores are only shown to users, so one that has no number becomes None
+    instead of failing the whole reply.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    number = re.search(r"-?\d+(?:\.\d+)?", str(value))
+    return float(number.group()) if number else None
+
+class Tweet(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    content: str = Field(min_length=1)
+    virality_score: Optional[float] = None
+    justification: str = ""
+
+    _score = field_validator("virality_score", mode="before")(_lenient_score)
+
+class Tweets(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    tweets: List[Tweet] = Field(min_length=1)
+
+class LinkedInPost(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    headline: str = ""
+    content: str = Field(min_length=1)
+    hashtags: List[str] = Field(default_factory=list)
+    effectiveness_score: Optional[float] = None
+    strategic_value: str = ""
+
+    _score = field_validator("effectiveness_score", mode="before")(_lenient_score)
+
+class LinkedInPosts(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    posts: List[LinkedInPost] = Field(min_length=1)
@@ -0,0 +1,133 @@
+import logging
+from typing import List, Optional, Tuple, Type
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from pydantic import BaseModel, ValidationError
+
+from src.assistant.utils.json_repair import repair_candidates
+from src.assistant.utils.llm_cache import defer_updates
+
+logger = logging.getLogger(__name__)
+
+# Re-asks per node call when local repair cannot produce a valid payload
+MAX_REASKS = 1
+
+REASK_PROMPT = (
+    "Your previous reply could not be used: {error}\n"
+    "Reply again with only the corrected JSON object, following the format from the instructions."
+)
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a node's reply still does not match its schema after repair and re-asking."""
+
+
+def _failed_generation(error: Exception) -> Optional[str]:
+    """
+    Groq rejects JSON-mode replies that are not valid JSON with a 400 that
+    carries the generated text; recover it so it can be repaired locally.
+    """
+    body = getattr(error, "body", None)
+    if isinstance(body, dict):
+        body = body.get("error", body)
+        if isinstance(body, dict) and body.get("failed_generation"):
+            return body["failed_generation"]
+    return None
+
+
+def parse_reply(text: str, schema: Type[BaseModel]) -> BaseModel:
+    """
+    Validate an LLM reply against a schema, repairing the JSON locally if needed.
+
+    Args:
+        text (str): The raw model output
+        schema (Type[BaseModel]): Expected payload
+
+    Returns:
+        BaseModel: The validated payload
+
+    Raises:
+        StructuredOutputError: If no repair candidate validates
+    """
+    error: Exception = ValueError("empty reply")
+    for candidate in repair_candidates(text or ""):
+        try:
+            return schema.model_validate_json(candidate)
+        except ValidationError as e:
+            error = e
+    # Pydantic lists every failing field; the first few are enough for a re-ask
+    raise StructuredOutputError(" ".join(str(error).split())[:500])
+
+
+def _reask_messages(messages: List[BaseMessage], text: str, error: Exception) -> List[BaseMessage]:
+    return [*messages, AIMessage(content=text), HumanMessage(content=REASK_PROMPT.format(error=error))]
+
+
+def invoke_structured(llm, messages: List[BaseMessage], schema: Type[BaseModel]) -> Tuple[BaseModel, AIMessage]:
+    """
+    Call a chat model in JSON mode and return a validated payload.
+
+    Malformed replies (truncation, trailing commas, code fences) are repaired
+    locally first; only if that fails is the model asked once more, in the
+    same node, with the validation error. The rest of the graph is never re-run.
+    Only replies that validate are written to the LLM cache.
+
+    Args:
+        llm (BaseChatModel): The model to call
+        messages (List[BaseMessage]): The prompt
+        schema (Type[BaseModel]): Expected payload
+
+    Returns:
+        Tuple[BaseModel, AIMessage]: The payload and the raw reply (for token usage)
+
+    Raises:
+        StructuredOutputError: If the reply is still invalid after MAX_REASKS re-asks
+    """
+    json_llm = llm.bind(response_format={"type": "json_object"})
+    for attempt in range(MAX_REASKS + 1):
+        # Replies are only cached once they validate, so a bad one is never replayed
+        with defer_updates() as pending:
+            try:
+                message = json_llm.invoke(messages)
+            except Exception as e:
+                text = _failed_generation(e)
+                if text is None:
+                    raise
+                message = AIMessage(content=text)
+        try:
+            payload = parse_reply(message.content, schema)
+        except StructuredOutputError as e:
+            if attempt == MAX_REASKS:
+                raise
+            logger.warning("Re-asking for valid %s: %s", schema.__name__, e)
+            messages = _reask_messages(messages, message.content, e)
+        else:
+            pending.commit()
+            return payload, message
+
+
+async def ainvoke_structured(llm, messages: List[BaseMessage], schema: Type[BaseModel]) -> Tuple[BaseModel, AIMessage]:
+    """
+    Async version of invoke_structured.
+    """
+    json_llm = llm.bind(response_format={"type": "json_object"})
+    for attempt in range(MAX_REASKS + 1):
+        # Replies are only cached once they validate, so a bad one is never replayed
+        with defer_updates() as pending:
+            try:
+                message = await json_llm.ainvoke(messages)
+            except Exception as e:
+                text = _failed_generation(e)
+                if text is None:
+                    raise
+                message = AIMessage(content=text)
+        try:
+            payload = parse_reply(message.content, schema)
+        except StructuredOutputError as e:
+            if attempt == MAX_REASKS:
+                raise
+            logger.warning("Re-asking for valid %s: %s", schema.__name__, e)
+            messages = _reask_messages(messages, message.content, e)
+        else:
+            pending.commit()
+            return payload, message
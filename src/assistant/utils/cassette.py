@@ -0,0 +1,330 @@
+import asyncio
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from http import HTTPStatus
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Request fields that carry credentials; they are dropped before hashing and never stored
+SECRET_FIELDS = frozenset({"api_key", "apikey", "access_token", "token", "key", "client_secret"})
+
+# Response headers kept in the cassette; the rest (dates, cookies, request ids) are dropped
+KEPT_HEADERS = frozenset({
+    "content-type", "retry-after", "x-restli-id", "location",
+    "x-ratelimit-limit-requests", "x-ratelimit-remaining-requests", "x-ratelimit-reset-requests",
+    "x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens",
+    "x-rate-limit-limit", "x-rate-limit-remaining", "x-rate-limit-reset",
+})
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode for a request the cassette has no recording of."""
+
+
+def _scrub(value):
+    if isinstance(value, dict):
+        return {k: _scrub(v) for k, v in value.items() if k.lower() not in SECRET_FIELDS}
+    if isinstance(value, list):
+        return [_scrub(v) for v in value]
+    return value
+
+
+def scrub_url(url: str) -> str:
+    """Drop credential query parameters from a URL."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_FIELDS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def request_key(method: str, url: str, body: Optional[bytes]) -> str:
+    """
+    Identify a request by method, URL path and query, and body, ignoring credentials.
+
+    The host is left out, so a cassette recorded against one host (e.g. the
+    benchmark stand-ins) replays for another. JSON bodies are compared after
+    scrubbing and with sorted keys, so key order and API keys in the payload
+    (as Tavily sends them) do not matter.
+
+    Returns:
+        str: Hex digest of the normalized request
+    """
+    body = body or b""
+    try:
+        normalized = json.dumps(_scrub(json.loads(body)), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        normalized = body
+    parts = urlsplit(scrub_url(url))
+    digest = hashlib.sha256(f"{method.upper()} {parts.path}?{parts.query}\0".encode("utf-8"))
+    digest.update(normalized)
+    return digest.hexdigest()
+
+
+class Cassette:
+    """
+    Recorded HTTP exchanges for deterministic runs without network access.
+
+    In "record" mode every request goes to the real service and the response is
+    kept; ``save()`` writes them to a gzip-compressed JSON file. In "replay" mode
+    responses come from the file and nothing is sent. Identical requests recorded
+    several times are replayed in recorded order, the last one repeating.
+
+    Only what is needed to rebuild a response is stored: the scrubbed URL, a hash
+    of the scrubbed request body, the status, a few headers, the body and how long
+    the service took. Request headers (and so Authorization) are never stored.
+
+    Attributes:
+        path (str): Cassette file
+        mode (str): "record" or "replay"
+        latency (float): In replay mode, share of the recorded latency to wait
+            before answering; 0 answers at once, 1 at recorded speed
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency: float = 0.0) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode {mode!r}; use 'record' or 'replay'")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._entries: Dict[str, List[Dict]] = defaultdict(list)
+        self._replayed: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self.load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as file:
+            for entry in json.load(file)["interactions"]:
+                self._entries[entry["key"]].append(entry)
+
+    def save(self) -> None:
+        with self._lock:
+            interactions = [entry for entries in self._entries.values() for entry in entries]
+        with gzip.open(self.path, "wt", encoding="utf-8") as file:
+            json.dump({"version": 1, "interactions": interactions}, file, separators=(",", ":"))
+
+    def record(self, method: str, url: str, body: Optional[bytes], status: int, headers, content: bytes, elapsed: float) -> None:
+        entry = {
+            "key": request_key(method, url, body),
+            "method": method.upper(),
+            "url": scrub_url(url),
+            "status": status,
+            "headers": {k.lower(): v for k, v in headers.items() if k.lower() in KEPT_HEADERS},
+            "body": content.decode("utf-8", errors="replace"),
+            "elapsed": round(elapsed, 4),
+        }
+        with self._lock:
+            self._entries[entry["key"]].append(entry)
+
+    def find(self, method: str, url: str, body: Optional[bytes]) -> Dict:
+        """
+        Returns:
+            Dict: The next recorded response for the request
+
+        Raises:
+            CassetteMissError: If the request was never recorded
+        """
+        key = request_key(method, url, body)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(f"No recording for {method.upper()} {scrub_url(url)} in {self.path}")
+            index = min(self._replayed[key], len(entries) - 1)
+            self._replayed[key] += 1
+            return entries[index]
+
+    def delay(self, entry: Dict) -> float:
+        return entry["elapsed"] * self.latency
+
+
+def _sse_chunks(body: bytes) -> List[bytes]:
+    # Server-sent events are replayed one event at a time, like a live stream
+    events = body.split(b"\n\n")
+    return [event + b"\n\n" for event in events[:-1]] + ([events[-1]] if events[-1] else [])
+
+
+class _ReplayStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """A recorded body, spread over the recorded latency when simulating it."""
+
+    def __init__(self, content: bytes, streamed: bool, delay: float) -> None:
+        self.chunks = _sse_chunks(content) if streamed else [content]
+        self.pause = delay / len(self.chunks) if streamed and self.chunks else 0.0
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self.chunks:
+            if self.pause:
+                time.sleep(self.pause)
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            if self.pause:
+                await asyncio.sleep(self.pause)
+            yield chunk
+
+
+def _is_stream(headers) -> bool:
+    return headers.get("content-type", "").startswith("text/event-stream")
+
+
+class CassetteTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    An httpx transport (sync and async) that records through, or replays from, a cassette.
+
+    Attributes:
+        cassette (Cassette): Where exchanges are recorded or replayed from
+        transport: The wrapped real transport; needed for recording only
+    """
+
+    def __init__(self, cassette: Cassette, transport=None) -> None:
+        self.cassette = cassette
+        self.transport = transport
+
+    def _replay(self, request: httpx.Request) -> Tuple[httpx.Response, float]:
+        entry = self.cassette.find(request.method, str(request.url), request.content)
+        streamed = _is_stream(entry["headers"])
+        delay = self.cassette.delay(entry)
+        return httpx.Response(
+            entry["status"], headers=entry["headers"],
+            stream=_ReplayStream(entry["body"].encode("utf-8"), streamed, delay), request=request,
+        ), (0.0 if streamed else delay)
+
+    def _record(self, request: httpx.Request, response: httpx.Response, content: bytes, elapsed: float) -> httpx.Response:
+        self.cassette.record(request.method, str(request.url), request.content, response.status_code, response.headers, content, elapsed)
+        # The body was consumed to record it; hand the caller an equivalent response
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request, extensions=response.extensions)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        if not self.cassette.recording:
+            response, delay = self._replay(request)
+            if delay:
+                time.sleep(delay)
+            return response
+        start = time.perf_counter()
+        response = self.transport.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        return self._record(request, response, content, time.perf_counter() - start)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        if not self.cassette.recording:
+            response, delay = self._replay(request)
+            if delay:
+                await asyncio.sleep(delay)
+            return response
+        start = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        return self._record(request, response, content, time.perf_counter() - start)
+
+    def close(self) -> None:
+        if self.transport is not None and hasattr(self.transport, "close"):
+            self.transport.close()
+
+    async def aclose(self) -> None:
+        if self.transport is not None and hasattr(self.transport, "aclose"):
+            await self.transport.aclose()
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    A requests adapter that records through, or replays from, a cassette.
+
+    Attributes:
+        cassette (Cassette): Where exchanges are recorded or replayed from
+        adapter (BaseAdapter): The wrapped real adapter; needed for recording only
+    """
+
+    def __init__(self, cassette: Cassette, adapter: Optional[BaseAdapter] = None) -> None:
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        body = request.body
+        if hasattr(body, "read"):
+            # File uploads (LinkedIn media) are read once so they can be hashed and still sent
+            body = body.read()
+            request.body = body
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        if self.cassette.recording:
+            start = time.perf_counter()
+            response = self.adapter.send(request, **kwargs)
+            self.cassette.record(request.method, request.url, body, response.status_code, response.headers,
+                                 response.content, time.perf_counter() - start)
+            return response
+
+        entry = self.cassette.find(request.method, request.url, body)
+        delay = self.cassette.delay(entry)
+        if delay:
+            time.sleep(delay)
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        try:
+            response.reason = HTTPStatus(entry["status"]).phrase
+        except ValueError:
+            response.reason = ""
+        return response
+
+    def close(self) -> None:
+        if self.adapter is not None:
+            self.adapter.close()
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """
+    The process-wide cassette, configured by HTTP_CASSETTE (file path),
+    HTTP_CASSETTE_MODE ("replay" by default, or "record") and
+    HTTP_CASSETTE_LATENCY (share of the recorded latency to simulate, 0 by default).
+
+    Returns:
+        Cassette: The cassette, or None when HTTP_CASSETTE is not set
+    """
+    global _cassette
+    path = os.getenv("HTTP_CASSETTE")
+    if not path:
+        return None
+    if _cassette is None or _cassette.path != path:
+        with _cassette_lock:
+            if _cassette is None or _cassette.path != path:
+                _cassette = Cassette(
+                    path,
+                    mode=os.getenv("HTTP_CASSETTE_MODE", "replay"),
+                    latency=float(os.getenv("HTTP_CASSETTE_LATENCY", "0")),
+                )
+                if _cassette.recording:
+                    atexit.register(_cassette.save)
+    return _cassette
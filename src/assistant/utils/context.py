@@ -0,0 +1,92 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+# Tokens reserved per search result for its title, URL and score lines in format_llm
+RESULT_OVERHEAD_TOKENS = 40
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """The tiktoken encoding used for counting, or None when tiktoken is not installed."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    # Llama 3 uses its own BPE vocabulary; cl100k_base is close enough for budgeting
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a piece of text.
+
+    Uses tiktoken when it is installed and otherwise estimates four characters
+    per token, which is close for English prose.
+
+    Args:
+        text (str): The text to count
+
+    Returns:
+        int: Number of tokens
+    """
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text down to at most ``max_tokens`` tokens, at a word boundary where possible.
+
+    Args:
+        text (str): The text to cut
+        max_tokens (int): Token limit
+
+    Returns:
+        str: The text, unchanged if it already fits
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is None:
+        cut = text[:max_tokens * 4]
+    else:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    head, _, _ = cut.rpartition(" ")
+    return (head or cut).rstrip() + " ..."
+
+
+def assemble_context(results: Iterable[Dict], budget: int) -> List[Dict]:
+    """
+    Select the search results that fit a token budget, best first.
+
+    Results are ranked by their Tavily ``score`` and added whole while they fit;
+    the first one that does not fit is trimmed to the remaining budget, and the
+    rest are dropped.
+
+    Args:
+        results (Iterable[Dict]): Search results with ``content`` and ``score``
+        budget (int): Tokens available for the results
+
+    Returns:
+        List[Dict]: The kept results in rank order, the last one possibly trimmed
+    """
+    kept = []
+    remaining = budget
+    for result in sorted(results, key=lambda res: res.get("score") or 0, reverse=True):
+        cost = count_tokens(result.get("content") or "") + RESULT_OVERHEAD_TOKENS
+        if cost <= remaining:
+            kept.append(result)
+            remaining -= cost
+            continue
+        room = remaining - RESULT_OVERHEAD_TOKENS
+        # Only keep a partial result if a meaningful part of it fits
+        if room >= 50:
+            kept.append({**result, "content": truncate_tokens(result.get("content") or "", room)})
+        break
+    return kept
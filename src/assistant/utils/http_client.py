@@ -0,0 +1,266 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, replace
+from email.utils import parsedate_to_datetime
+from typing import Dict, FrozenSet, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import InvalidHeader, MaxRetryError
+from urllib3.util.retry import Retry
+
+from src.assistant.utils.cassette import CassetteAdapter, CassetteTransport, get_cassette
+from src.assistant.utils.metrics import RETRIES
+
+
+@dataclass
+class HTTPConfig:
+    """
+    Connection pool, timeout and retry settings shared by the outbound HTTP clients.
+
+    Attributes:
+        pool_connections (int): Number of per-host pools kept by the sync session
+        pool_maxsize (int): Maximum open connections per host
+        keepalive_expiry (float): Seconds an idle keep-alive connection is kept open
+        connect_timeout (float): Seconds to wait for a connection
+        read_timeout (float): Seconds to wait for a response
+        retries (int): Retries for connection errors and retryable statuses
+        backoff_factor (float): Exponential backoff base in seconds
+        max_backoff (float): Longest wait before a retry in seconds; a response whose
+            Retry-After asks for longer is returned instead of retried
+        retry_statuses (Tuple[int, ...]): Status codes that are retried
+        retry_methods (FrozenSet[str]): Methods retried after the request may have
+            reached the server; only idempotent ones by default, so a post is never
+            published twice
+    """
+
+    pool_connections: int = 10
+    pool_maxsize: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    retries: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+    retry_methods: FrozenSet[str] = Retry.DEFAULT_ALLOWED_METHODS
+
+    @classmethod
+    def from_env(cls) -> "HTTPConfig":
+        """
+        Build a config from HTTP_* environment variables, falling back to the defaults.
+        """
+        return cls(
+            pool_connections=int(os.getenv("HTTP_POOL_CONNECTIONS", cls.pool_connections)),
+            pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", cls.pool_maxsize)),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", cls.connect_timeout)),
+            read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", cls.read_timeout)),
+            retries=int(os.getenv("HTTP_RETRIES", cls.retries)),
+            backoff_factor=float(os.getenv("HTTP_BACKOFF_FACTOR", cls.backoff_factor)),
+            max_backoff=float(os.getenv("HTTP_MAX_BACKOFF", cls.max_backoff)),
+        )
+
+    def with_post_retries(self) -> "HTTPConfig":
+        """
+        The same settings, also retrying POST; only for read-only POST APIs such as Tavily search.
+        """
+        return replace(self, retry_methods=self.retry_methods | {"POST"})
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter that applies a default timeout to requests that don't set one.
+    """
+
+    def __init__(self, *args, timeout: Optional[Tuple[float, float]] = None, **kwargs) -> None:
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class CountingRetry(Retry):
+    """
+    A urllib3 Retry that counts every retry it allows in the outbound_retries_total metric,
+    and gives up (returning the response) when Retry-After asks for more than ``backoff_max``.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and self.respect_retry_after_header:
+            try:
+                too_long = self.parse_retry_after(retry_after) > self.backoff_max
+            except InvalidHeader:
+                too_long = False
+            if too_long:
+                raise MaxRetryError(_pool, url, error)
+        # Raises MaxRetryError once the budget is spent, so only real retries are counted
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        RETRIES.inc(getattr(_pool, "host", None) or "unknown")
+        return retry
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """
+    An httpx transport that retries retryable status codes of requests whose method
+    is in ``config.retry_methods``, with exponential backoff honouring Retry-After.
+    A Retry-After longer than ``config.max_backoff`` is not waited for; the
+    response is returned instead. Connection errors are retried by the wrapped transport.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, config: HTTPConfig) -> None:
+        self.transport = transport
+        self.config = config
+
+    def _delay(self, response: httpx.Response, attempt: int) -> float:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return min(self.config.backoff_factor * (2 ** attempt), self.config.max_backoff)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        retries = self.config.retries if request.method in self.config.retry_methods else 0
+        for attempt in range(retries + 1):
+            response = await self.transport.handle_async_request(request)
+            if response.status_code not in self.config.retry_statuses or attempt == retries:
+                return response
+            delay = self._delay(response, attempt)
+            if delay > self.config.max_backoff:
+                # The server wants a longer pause than a request should be held for
+                return response
+            RETRIES.inc(request.url.host)
+            # Drain the body so the connection goes back to the pool instead of being dropped
+            await response.aread()
+            await response.aclose()
+            await asyncio.sleep(delay)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def create_session(config: Optional[HTTPConfig] = None) -> requests.Session:
+    """
+    Create a requests session with a keep-alive connection pool, default timeouts
+    and retry with backoff on connection errors and retryable statuses.
+
+    Args:
+        config (HTTPConfig, optional): Pool/timeout/retry settings. Defaults to HTTPConfig.from_env()
+
+    Returns:
+        requests.Session: The configured session
+    """
+    config = config or HTTPConfig.from_env()
+    retry = CountingRetry(
+        total=config.retries,
+        backoff_factor=config.backoff_factor,
+        backoff_max=config.max_backoff,
+        status_forcelist=config.retry_statuses,
+        allowed_methods=config.retry_methods,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        pool_connections=config.pool_connections,
+        pool_maxsize=config.pool_maxsize,
+        max_retries=retry,
+        timeout=(config.connect_timeout, config.read_timeout),
+    )
+    cassette = get_cassette()
+    if cassette is not None:
+        adapter = CassetteAdapter(cassette, adapter)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def create_async_client(config: Optional[HTTPConfig] = None) -> httpx.AsyncClient:
+    """
+    Create an httpx async client with the same pooling, timeout and retry behaviour
+    as create_session.
+
+    Args:
+        config (HTTPConfig, optional): Pool/timeout/retry settings. Defaults to HTTPConfig.from_env()
+
+    Returns:
+        httpx.AsyncClient: The configured client
+    """
+    config = config or HTTPConfig.from_env()
+    limits = httpx.Limits(
+        max_connections=config.pool_connections * config.pool_maxsize,
+        max_keepalive_connections=config.pool_maxsize,
+        keepalive_expiry=config.keepalive_expiry,
+    )
+    transport = AsyncRetryTransport(httpx.AsyncHTTPTransport(limits=limits, retries=config.retries), config)
+    cassette = get_cassette()
+    if cassette is not None:
+        transport = CassetteTransport(cassette, transport)
+    timeout = httpx.Timeout(config.read_timeout, connect=config.connect_timeout)
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+
+def _config(retry_post: bool) -> HTTPConfig:
+    config = HTTPConfig.from_env()
+    return config.with_post_retries() if retry_post else config
+
+
+# Keyed by retry_post: writes (LinkedIn) and read-only POSTs (Tavily) need different retry rules
+_sessions: Dict[bool, requests.Session] = {}
+_session_lock = threading.Lock()
+# httpx connections belong to the event loop that opened them, so keep clients per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[bool, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+
+def get_session(retry_post: bool = False) -> requests.Session:
+    """
+    Args:
+        retry_post (bool, optional): Also retry POSTs, for APIs where a POST only reads. Defaults to False
+
+    Returns:
+        requests.Session: The process-wide session, created on first use
+    """
+    session = _sessions.get(retry_post)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retry_post)
+            if session is None:
+                session = _sessions[retry_post] = create_session(_config(retry_post))
+    return session
+
+
+def get_async_client(retry_post: bool = False) -> httpx.AsyncClient:
+    """
+    Args:
+        retry_post (bool, optional): Also retry POSTs, for APIs where a POST only reads. Defaults to False
+
+    Returns:
+        httpx.AsyncClient: The shared client for the running event loop, created on first use
+    """
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(retry_post)
+    if client is None or client.is_closed:
+        client = clients[retry_post] = create_async_client(_config(retry_post))
+    return client
+
+
+async def close_async_client() -> None:
+    """
+    Close the shared clients of the running event loop, if any were opened.
+    """
+    for client in _async_clients.pop(asyncio.get_running_loop(), {}).values():
+        await client.aclose()
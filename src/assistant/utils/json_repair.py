@@ -0,0 +1,121 @@
+import json
+import re
+from typing import Any, Iterator, List, Tuple
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+
+def _strip_wrapping(text: str) -> str:
+    """Drop Markdown code fences and any prose before the first JSON container."""
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    return text[min(starts):] if starts else text
+
+
+def _scan(text: str) -> Tuple[str, List[str], bool, List[int]]:
+    """
+    Walk the text once, dropping trailing commas before closing brackets. The
+    walk stops at the bracket that closes the first container, so prose after
+    the JSON (e.g. "hope it helps") is dropped.
+
+    Returns:
+        Tuple: The cleaned text, the containers still open at the end, whether
+        it ends inside a string, and the offsets (in the cleaned text) right
+        after each complete item of a container, where truncated text can be cut
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escaped = False
+    cut_points: List[int] = []
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            # A comma right before a closing bracket is invalid JSON
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            closed_outermost = len(stack) == 1
+            if stack:
+                stack.pop()
+            out.append(char)
+            cut_points.append(len(out))
+            if closed_outermost:
+                break
+            continue
+        elif char == ",":
+            cut_points.append(len(out))
+        out.append(char)
+    return "".join(out), stack, in_string, cut_points
+
+
+def _close(text: str) -> str:
+    """Close whatever containers (and string) are still open at the end of text."""
+    text = text.rstrip().rstrip(",").rstrip()
+    _, stack, in_string, _ = _scan(text)
+    if in_string:
+        text += '"'
+    if text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(stack))
+
+
+def repair_candidates(text: str) -> Iterator[str]:
+    """
+    Yield progressively more aggressive repairs of an LLM's JSON reply.
+
+    In order: the text without code fences or leading prose, the text with
+    trailing commas and trailing prose removed, the text cut back to its last complete item with
+    its brackets closed (drops a half-written final element), and the text with
+    its open string and brackets closed where it stopped.
+
+    Args:
+        text (str): The raw model output
+
+    Yields:
+        str: Candidate JSON documents, not necessarily valid
+    """
+    stripped = _strip_wrapping(text.strip())
+    yield stripped
+    cleaned, stack, in_string, cut_points = _scan(stripped)
+    yield cleaned
+    if stack or in_string:
+        for cut in reversed(cut_points):
+            yield _close(cleaned[:cut])
+            break
+        yield _close(cleaned)
+
+
+def loads_lenient(text: str) -> Any:
+    """
+    Parse an LLM's JSON reply, repairing code fences, trailing commas and truncation locally.
+
+    Args:
+        text (str): The raw model output
+
+    Returns:
+        Any: The first candidate from repair_candidates that parses
+
+    Raises:
+        ValueError: If no repair produces valid JSON
+    """
+    for candidate in repair_candidates(text):
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            continue
+    raise ValueError(f"Could not repair JSON: {text[:200]!r}")
@@ -0,0 +1,86 @@
+import json
+from typing import Any, List, Optional
+
+
+class JSONArrayStream:
+    """
+    An incremental parser that pulls complete items out of a JSON array while
+    the document is still being generated.
+
+    Feed it the text of a streaming LLM response chunk by chunk; every call
+    returns the array items that became complete, so e.g. each tweet of
+    ``{"tweets": [{...}, {...}, ...]}`` can be shown as soon as its closing
+    brace arrives instead of after the whole completion.
+
+    Attributes:
+        key (str): Name of the top-level field holding the array, or None to
+            stream the items of a top-level array
+    """
+
+    def __init__(self, key: Optional[str] = None) -> None:
+        self.key = key
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Consume the next piece of the document.
+
+        Args:
+            text (str): Newly generated text
+
+        Returns:
+            List[Any]: Items of the target array completed by this piece, in order
+        """
+        self._buffer += text
+        items = []
+        buffer = self._buffer
+        while self._pos < len(buffer):
+            char = buffer[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    try:
+                        self._last_string = json.loads(buffer[self._string_start:self._pos + 1])
+                    except ValueError:
+                        self._last_string = None
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char in "{[":
+                if self._array_depth is not None and len(self._stack) == self._array_depth and self._item_start is None:
+                    self._item_start = self._pos
+                self._stack.append(char)
+                if char == "[" and self._array_depth is None and self._is_target_array():
+                    self._array_depth = len(self._stack)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if self._array_depth is not None and len(self._stack) == self._array_depth and self._item_start is not None:
+                    try:
+                        items.append(json.loads(buffer[self._item_start:self._pos + 1]))
+                    except ValueError:
+                        pass
+                    self._item_start = None
+                elif self._array_depth is not None and len(self._stack) < self._array_depth:
+                    # The target array closed; later arrays are not streamed
+                    self._array_depth = -1
+            self._pos += 1
+        return items
+
+    def _is_target_array(self) -> bool:
+        if self.key is None:
+            return len(self._stack) == 1
+        # The array must be the value of ``key`` in the top-level object
+        return len(self._stack) == 2 and self._stack[0] == "{" and self._last_string == self.key
@@ -1,6 +1,10 @@
-import requests
 import json
+import logging
 import os
+from src.assistant.utils.http_client import get_session
+from src.assistant.utils.metrics import observe
+
+logger = logging.getLogger(__name__)
 
 
 class LinkedInShare:
@@ -9,16 +13,19 @@ class LinkedInShare:
     This class provides methods to post content to LinkedIn, including text, articles/URLs, and images/videos.
     """
     
-    def __init__(self, access_token, person_urn=None):
+    def __init__(self, access_token, person_urn=None, session=None, base_url=None):
         """
         Initialize the LinkedIn API wrapper with an OAuth 2.0 access token.
         
         Args:
             access_token (str): OAuth 2.0 access token with w_member_social scope
             person_urn (str, optional): Your LinkedIn Person URN (e.g., "urn:li:person:Hi1z4OfXkc")
+            session (requests.Session, optional): Pooled session to send requests with; the shared one by default
+            base_url (str, optional): API root; LINKEDIN_BASE_URL or https://api.linkedin.com/v2 by default
         """
         self.access_token = access_token
-        self.base_url = "https://api.linkedin.com/v2"
+        self.session = session or get_session()
+        self.base_url = (base_url or os.getenv("LINKEDIN_BASE_URL", "https://api.linkedin.com/v2")).rstrip("/")
         self.headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
@@ -30,6 +37,26 @@ class LinkedInShare:
         if not self.person_urn:
             self.get_person_urn()
     
+    def _request(self, operation, method, url, **kwargs):
+        """
+        Send a request through the shared session, timing it as a LinkedIn call.
+
+        Args:
+            operation (str): Name recorded in the outbound request metrics
+            method (str): HTTP method
+            url (str): Request URL
+
+        Returns:
+            requests.Response: The response
+        """
+        with observe("linkedin", operation) as span:
+            response = self.session.request(method, url, **kwargs)
+            if response.status_code == 429:
+                span["outcome"] = "rate_limited"
+            elif response.status_code >= 400:
+                span["outcome"] = "error"
+            return response
+
     def get_person_urn(self):
         """
         Get the profile information of the authenticated user to retrieve the Person URN.
@@ -38,7 +65,7 @@ class LinkedInShare:
             dict: Profile information
         """
         url = f"{self.base_url}/userinfo"
-        response = requests.get(url, headers=self.headers)
+        response = self._request("userinfo", "GET", url, headers=self.headers)
         response.raise_for_status()
         profile_data = response.json()
         self.person_urn = f"urn:li:person:{profile_data['sub']}"
@@ -76,7 +103,7 @@ class LinkedInShare:
             }
         }
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._request("ugc_posts", "POST", url, headers=self.headers, json=payload)
         result = {
             "status_code": response.status_code,
             "headers": dict(response.headers),
@@ -135,7 +162,7 @@ class LinkedInShare:
             }
         }
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._request("ugc_posts", "POST", url, headers=self.headers, json=payload)
         result = {
             "status_code": response.status_code,
             "headers": dict(response.headers),
@@ -177,11 +204,10 @@ class LinkedInShare:
             }
         }
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._request("register_upload", "POST", url, headers=self.headers, json=payload)
         
         if response.status_code != 200:
-            print(f"Error registering upload: {response.status_code}")
-            print(response.text)
+            logger.warning("Error registering upload: %s %s", response.status_code, response.text)
             return None
         
         data = response.json()
@@ -191,8 +217,7 @@ class LinkedInShare:
             asset_id = data["value"]["asset"]
             return upload_url, asset_id
         except KeyError as e:
-            print(f"Unexpected response format: {e}")
-            print(data)
+            logger.warning("Unexpected response format: %s %s", e, data)
             return None
     
     def upload_media(self, upload_url, file_path):
@@ -210,13 +235,12 @@ class LinkedInShare:
             headers = {
                 "Authorization": f"Bearer {self.access_token}"
             }
-            response = requests.post(upload_url, headers=headers, data=file)
+            response = self._request("upload_media", "POST", upload_url, headers=headers, data=file)
             
             if response.status_code >= 200 and response.status_code < 300:
                 return True
             else:
-                print(f"Error uploading media: {response.status_code}")
-                print(response.text)
+                logger.warning("Error uploading media: %s %s", response.status_code, response.text)
                 return False
     
     def post_image(self, text, image_path, title=None, description=None, visibility="PUBLIC"):
@@ -279,7 +303,7 @@ class LinkedInShare:
             }
         }
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._request("ugc_posts", "POST", url, headers=self.headers, json=payload)
         result = {
             "status_code": response.status_code,
             "headers": dict(response.headers),
@@ -351,7 +375,7 @@ class LinkedInShare:
             }
         }
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._request("ugc_posts", "POST", url, headers=self.headers, json=payload)
         result = {
             "status_code": response.status_code,
             "headers": dict(response.headers),
@@ -0,0 +1,189 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+from src.assistant.utils.metrics import CACHE_LOOKUPS
+
+
+def _current_node() -> str:
+    """Name of the LangGraph node making the LLM call, or "unknown" outside a graph run."""
+    try:
+        from langgraph.config import get_config
+
+        return get_config().get("metadata", {}).get("langgraph_node", "unknown")
+    except RuntimeError:
+        return "unknown"
+
+
+class PendingUpdates:
+    """Cache writes held back until the reply they store is known to be usable."""
+
+    def __init__(self) -> None:
+        self.updates: List[tuple] = []
+
+    def commit(self) -> None:
+        for cache, args in self.updates:
+            cache.store(*args)
+        self.updates.clear()
+
+
+_pending: ContextVar[Optional[PendingUpdates]] = ContextVar("llm_cache_pending", default=None)
+
+
+@contextmanager
+def defer_updates() -> Iterator[PendingUpdates]:
+    """
+    Hold back the cache writes of LLM calls made inside the block.
+
+    Nothing is cached unless ``commit()`` is called on the returned object, so a
+    caller that validates replies (see structured.py) only caches valid ones.
+    """
+    pending = PendingUpdates()
+    token = _pending.set(pending)
+    try:
+        yield pending
+    finally:
+        _pending.reset(token)
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache(BaseCache):
+    """
+    A LangChain LLM cache with an exact-match tier and an optional similarity tier.
+
+    Pass it as the ``cache`` of a chat model. LangChain hands every lookup the
+    serialized message list and the model configuration string (model name,
+    temperature, bound kwargs such as ``response_format``); the exact tier keys
+    on a hash of both. When an ``embed`` function is supplied, exact misses fall
+    back to the most similar cached prompt for the same model configuration.
+
+    Hits and misses are counted per LangGraph node.
+
+    Attributes:
+        max_entries (int): Maximum number of responses kept
+        ttl (float): Seconds a response stays valid; None keeps it until evicted
+        embed (Callable): Optional function mapping the serialized prompt to a vector
+        similarity_threshold (float): Minimum cosine similarity for a similarity hit
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        similarity_threshold: float = 0.97,
+    ) -> None:
+        """
+        Args:
+            max_entries (int, optional): Size of the cache. Defaults to 1024
+            ttl (float, optional): Lifetime of a response in seconds. Defaults to None (no expiry)
+            embed (Callable, optional): Embedding function enabling the similarity tier. Defaults to None
+            similarity_threshold (float, optional): Cosine similarity needed for a near match. Defaults to 0.97
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "similar_hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(prompt: str, llm_string: str) -> str:
+        """
+        Args:
+            prompt (str): Serialized message list
+            llm_string (str): Serialized model configuration
+
+        Returns:
+            str: Hex digest identifying the call
+        """
+        digest = hashlib.sha256(llm_string.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        node = _current_node()
+        key = self.key(prompt, llm_string)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats[node]["hits"] += 1
+                CACHE_LOOKUPS.inc("llm", "hit")
+                return entry[2]
+
+        if self.embed is not None:
+            vector = self.embed(prompt)
+            with self._lock:
+                best, best_score = None, self.similarity_threshold
+                for entry_llm_string, entry_vector, value, expires_at in self._entries.values():
+                    if entry_llm_string != llm_string or entry_vector is None or expires_at <= now:
+                        continue
+                    score = _cosine(vector, entry_vector)
+                    if score >= best_score:
+                        best, best_score = value, score
+                if best is not None:
+                    self._stats[node]["similar_hits"] += 1
+                    CACHE_LOOKUPS.inc("llm", "similar_hit")
+                    return best
+
+        with self._lock:
+            self._stats[node]["misses"] += 1
+        CACHE_LOOKUPS.inc("llm", "miss")
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        pending = _pending.get()
+        if pending is not None:
+            pending.updates.append((self, (prompt, llm_string, return_val)))
+            return
+        self.store(prompt, llm_string, return_val)
+
+    def store(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """
+        Cache a response now, even inside a defer_updates block.
+        """
+        vector = self.embed(prompt) if self.embed is not None else None
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else math.inf
+        key = self.key(prompt, llm_string)
+        with self._lock:
+            self._entries[key] = (llm_string, vector, return_val, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            Dict[str, Dict[str, float]]: Hits, similarity hits, misses and hit rate for each node
+        """
+        with self._lock:
+            report = {}
+            for node, counts in self._stats.items():
+                lookups = counts["hits"] + counts["similar_hits"] + counts["misses"]
+                hit_rate = (counts["hits"] + counts["similar_hits"]) / lookups if lookups else 0.0
+                report[node] = {**counts, "hit_rate": hit_rate}
+            return report
@@ -0,0 +1,309 @@
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Latency buckets in seconds, from cache hits to slow 70B completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+# USD per million prompt / completion tokens on Groq
+MODEL_PRICES_PER_MTOK = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+trace_logger = logging.getLogger("src.assistant.trace")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    A monotonically increasing value per label set, in the Prometheus data model.
+
+    Attributes:
+        name (str): Metric name
+        help (str): Description shown in the exposition
+        labelnames (Tuple[str]): Label names, in the order values are passed to inc()
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: Any) -> float:
+        return self._values.get(labels, 0)
+
+    def totals(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, labels)} {value}" for labels, value in items]
+
+
+class Histogram:
+    """
+    Observations bucketed by upper bound per label set, in the Prometheus data model.
+
+    Attributes:
+        name (str): Metric name
+        help (str): Description shown in the exposition
+        labelnames (Tuple[str]): Label names, in the order values are passed to observe()
+        buckets (Tuple[float]): Upper bounds of the buckets
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., +Inf count], sum
+        self._values: Dict[Tuple, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: Any) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, *labels: Any) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry else 0
+
+    def totals(self) -> Dict[Tuple, Tuple[int, float]]:
+        """
+        Returns:
+            Dict[Tuple, Tuple[int, float]]: Observation count and sum per label set
+        """
+        with self._lock:
+            return {labels: (sum(counts), total[0]) for labels, (counts, total) in self._values.items()}
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total[0]) for labels, (counts, total) in self._values.items()]
+        lines = []
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket = 'le="' + le + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, bucket)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    The set of metrics exposed by the process.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Any] = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Returns:
+            str: All metrics in the Prometheus text exposition format (version 0.0.4)
+        """
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+NODE_SECONDS = registry.register(Histogram(
+    "research_node_duration_seconds", "Wall time of each research graph node", ["node"]))
+NODE_ERRORS = registry.register(Counter(
+    "research_node_errors_total", "Research graph node runs that raised", ["node"]))
+OUTBOUND_SECONDS = registry.register(Histogram(
+    "outbound_request_duration_seconds", "Wall time of calls to external services",
+    ["service", "operation", "outcome"]))
+RETRIES = registry.register(Counter(
+    "outbound_retries_total", "HTTP requests retried after a retryable status or connection error", ["host"]))
+CACHE_LOOKUPS = registry.register(Counter(
+    "cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"]))
+SINGLE_FLIGHT = registry.register(Counter(
+    "research_single_flight_total", "Research requests that started a run (leader) or joined an identical one (follower)", ["role"]))
+LLM_TOKENS = registry.register(Counter(
+    "llm_tokens_total", "LLM tokens by node, model and kind (prompt or completion)", ["node", "model", "kind"]))
+LLM_COST = registry.register(Counter(
+    "llm_cost_usd_total", "Estimated LLM spend in USD from MODEL_PRICES_PER_MTOK", ["model"]))
+
+
+def _emit_span(name: str, started: float, duration: float, attrs: Dict[str, Any]) -> None:
+    try:
+        from langgraph.config import get_config
+
+        thread_id = get_config().get("configurable", {}).get("thread_id")
+    except RuntimeError:
+        thread_id = None
+    trace_logger.debug(json.dumps({
+        "span": name, "thread_id": thread_id, "start": round(started, 6),
+        "duration_ms": round(duration * 1000, 3), **attrs,
+    }, default=str))
+
+
+@contextmanager
+def observe(service: str, operation: str) -> Iterator[Dict[str, str]]:
+    """
+    Time a call to an external service.
+
+    The yielded dict's "outcome" can be changed (e.g. to "rate_limited") before
+    the block exits; it is "error" if the block raises and "ok" otherwise. A
+    trace span is logged when the ``src.assistant.trace`` logger is at DEBUG.
+
+    Args:
+        service (str): e.g. "groq", "tavily", "x", "linkedin"
+        operation (str): e.g. "search", "create_tweet"
+    """
+    outcome = {"outcome": "ok"}
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        yield outcome
+    except BaseException:
+        outcome["outcome"] = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        OUTBOUND_SECONDS.observe(duration, service, operation, outcome["outcome"])
+        if trace_logger.isEnabledFor(logging.DEBUG):
+            _emit_span(f"{service}.{operation}", started, duration, outcome)
+
+
+def instrument_node(name: str, func: Callable) -> Callable:
+    """
+    Wrap a graph node (sync or async) so its wall time and failures are recorded.
+
+    Args:
+        name (str): The node name used in the graph
+        func (Callable): The node function
+
+    Returns:
+        Callable: A function with the same signature
+    """
+    def record(start: float, started: float, failed: bool) -> None:
+        duration = time.perf_counter() - start
+        NODE_SECONDS.observe(duration, name)
+        if failed:
+            NODE_ERRORS.inc(name)
+        if trace_logger.isEnabledFor(logging.DEBUG):
+            _emit_span(f"node.{name}", started, duration, {"error": failed})
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started, start, failed = time.time(), time.perf_counter(), True
+            try:
+                result = await func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                record(start, started, failed)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started, start, failed = time.time(), time.perf_counter(), True
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            record(start, started, failed)
+    return wrapper
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    A LangChain callback that records the latency, tokens and estimated cost of
+    every chat model call, labelled with the graph node that made it.
+    """
+
+    def __init__(self) -> None:
+        self._runs: Dict[UUID, Tuple[float, float, str, str]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[Dict] = None, invocation_params: Optional[Dict] = None, **kwargs: Any) -> None:
+        metadata = metadata or {}
+        params = invocation_params or kwargs.get("invocation_params") or {}
+        model = metadata.get("ls_model_name") or params.get("model") or params.get("model_name") or "unknown"
+        node = metadata.get("langgraph_node", "unknown")
+        self._runs[run_id] = (time.time(), time.perf_counter(), node, model)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        started, start, node, model = run
+        duration = time.perf_counter() - start
+        usage: Dict[str, int] = {}
+        cached = False
+        for generations in response.generations:
+            for generation in generations:
+                message_usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                # LangChain zeroes total_cost on responses served from the LLM cache
+                cached = cached or message_usage.get("total_cost") == 0
+                for key in ("input_tokens", "output_tokens"):
+                    usage[key] = usage.get(key, 0) + (message_usage.get(key) or 0)
+        OUTBOUND_SECONDS.observe(duration, "groq", node, "cache_hit" if cached else "ok")
+        if cached:
+            return
+        prompt, completion = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        LLM_TOKENS.inc(node, model, "prompt", amount=prompt)
+        LLM_TOKENS.inc(node, model, "completion", amount=completion)
+        price_in, price_out = MODEL_PRICES_PER_MTOK.get(model, (0.0, 0.0))
+        LLM_COST.inc(model, amount=(prompt * price_in + completion * price_out) / 1_000_000)
+        if trace_logger.isEnabledFor(logging.DEBUG):
+            _emit_span(f"groq.{node}", started, duration, {"model": model, "prompt_tokens": prompt, "completion_tokens": completion})
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is not None:
+            _, start, node, _ = run
+            OUTBOUND_SECONDS.observe(time.perf_counter() - start, "groq", node, "error")
+
+
+llm_metrics = LLMMetricsHandler()
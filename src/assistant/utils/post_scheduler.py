@@ -0,0 +1,258 @@
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Mapping, Optional, Tuple
+
+import tweepy
+
+from src.assistant.utils.metrics import observe
+
+
+class RateLimitBucket:
+    """
+    A token bucket mirroring the X API rate-limit window for an endpoint.
+
+    The bucket starts optimistic and is corrected from the ``x-rate-limit-*``
+    headers of every response, so it converges on the server's own count.
+
+    Attributes:
+        limit (int): Requests allowed per window, once known
+        remaining (int): Requests left in the current window, once known
+        reset_at (float): Epoch seconds when the window resets
+    """
+
+    def __init__(self, limit: Optional[int] = None, window: float = 900) -> None:
+        self.limit = limit
+        self.remaining = limit
+        self.window = window
+        self.reset_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Tuple[bool, float]:
+        """
+        Take a token if one is available.
+
+        Returns:
+            Tuple[bool, float]: Whether a token was taken, and when to retry if not
+        """
+        with self._lock:
+            now = time.time()
+            if self.reset_at and now >= self.reset_at:
+                self.remaining = self.limit
+                self.reset_at = now + self.window
+            if self.remaining is None:
+                return True, now
+            if self.remaining > 0:
+                self.remaining -= 1
+                return True, now
+            return False, self.reset_at
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Sync the bucket with the rate-limit headers of an X API response.
+
+        Args:
+            headers (Mapping[str, str]): Response headers
+        """
+        with self._lock:
+            if "x-rate-limit-limit" in headers:
+                self.limit = int(headers["x-rate-limit-limit"])
+            if "x-rate-limit-remaining" in headers:
+                self.remaining = int(headers["x-rate-limit-remaining"])
+            if "x-rate-limit-reset" in headers:
+                self.reset_at = float(headers["x-rate-limit-reset"])
+
+    def exhaust(self, retry_at: float) -> None:
+        """
+        Mark the window as used up, e.g. after a 429 without usable headers.
+        """
+        with self._lock:
+            self.remaining = 0
+            self.reset_at = retry_at
+
+
+class PostJob:
+    """
+    The state of one batch of tweets handed to the PostScheduler.
+
+    Attributes:
+        job_id (str): Identifier to poll the job with
+        results (List[Dict]): One entry per tweet with its status, id or error
+    """
+
+    def __init__(self, tweets: List[str]) -> None:
+        self.job_id = str(uuid.uuid4())
+        self.created_at = time.time()
+        self.results: List[Dict] = [{"tweet": tweet, "status": "queued"} for tweet in tweets]
+        self._changed = threading.Condition()
+
+    def _set(self, index: int, **fields) -> None:
+        with self._changed:
+            self.results[index].update(fields)
+            self._changed.notify_all()
+
+    @property
+    def settled(self) -> bool:
+        """Whether every tweet has been posted, has failed, or is waiting for the rate limit to reset."""
+        return all(result["status"] in ("posted", "failed", "deferred") for result in self.results)
+
+    @property
+    def done(self) -> bool:
+        """Whether every tweet has been posted or has failed."""
+        return all(result["status"] in ("posted", "failed") for result in self.results)
+
+    def wait(self, timeout: Optional[float] = None, until: str = "settled") -> bool:
+        """
+        Block until the job is settled (or done).
+
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to None (forever)
+            until (str, optional): "settled" or "done". Defaults to "settled"
+
+        Returns:
+            bool: Whether the condition was reached before the timeout
+        """
+        with self._changed:
+            return self._changed.wait_for(lambda: getattr(self, until), timeout)
+
+    def snapshot(self) -> Dict:
+        """
+        Returns:
+            Dict: JSON-serializable view of the job
+        """
+        with self._changed:
+            return {
+                "job_id": self.job_id,
+                "done": self.done,
+                "results": [dict(result) for result in self.results],
+            }
+
+
+class PostScheduler:
+    """
+    Posts tweets from a bounded worker pool without ever sleeping on the rate limit.
+
+    Sends run in a thread pool so the event loop is never blocked. A token bucket
+    tracks the create_tweet rate limit; tweets that would exceed it are queued
+    and sent when the window resets instead of blocking a worker.
+
+    Attributes:
+        bucket (RateLimitBucket): Rate-limit state for create_tweet
+        jobs (Dict[str, PostJob]): Jobs by id, most recent ``max_jobs`` kept
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], tweepy.Client],
+        max_workers: int = 4,
+        max_jobs: int = 1000,
+        max_defer_delay: float = 60,
+    ) -> None:
+        """
+        Args:
+            client_factory (Callable): Builds the tweepy client. It should use
+                wait_on_rate_limit=False and return_type=requests.Response so
+                rate-limit headers are visible
+            max_workers (int, optional): Concurrent sends. Defaults to 4
+            max_jobs (int, optional): Finished jobs kept for polling. Defaults to 1000
+            max_defer_delay (float, optional): Longest wait before re-checking
+                queued tweets, in case the headers move the reset earlier. Defaults to 60
+        """
+        self.client_factory = client_factory
+        self.max_defer_delay = max_defer_delay
+        self.bucket = RateLimitBucket()
+        self.jobs: Dict[str, PostJob] = {}
+        self.max_jobs = max_jobs
+        self._client = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="post-tweets")
+        self._deferred: Deque[Tuple[PostJob, int]] = deque()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> tweepy.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = self.client_factory()
+            return self._client
+
+    def submit(self, tweets: List[str]) -> PostJob:
+        """
+        Queue a batch of tweets and return immediately.
+
+        Args:
+            tweets (List[str]): Tweet texts
+
+        Returns:
+            PostJob: The job tracking the batch
+        """
+        job = PostJob(tweets)
+        with self._lock:
+            self.jobs[job.job_id] = job
+            while len(self.jobs) > self.max_jobs:
+                self.jobs.pop(next(iter(self.jobs)))
+        for index in range(len(tweets)):
+            self._dispatch(job, index)
+        return job
+
+    def get(self, job_id: str) -> Optional[PostJob]:
+        return self.jobs.get(job_id)
+
+    def _dispatch(self, job: PostJob, index: int) -> None:
+        allowed, retry_at = self.bucket.acquire()
+        if allowed:
+            job._set(index, status="posting", retry_at=None)
+            self._executor.submit(self._post, job, index)
+        else:
+            self._defer(job, index, retry_at)
+
+    def _defer(self, job: PostJob, index: int, retry_at: float) -> None:
+        job._set(index, status="deferred", retry_at=retry_at)
+        with self._lock:
+            self._deferred.append((job, index))
+            if self._timer is None:
+                delay = min(max(0.0, retry_at - time.time()) + 1, self.max_defer_delay)
+                self._timer = threading.Timer(delay, self._drain)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _drain(self) -> None:
+        with self._lock:
+            self._timer = None
+            pending, self._deferred = self._deferred, deque()
+        for job, index in pending:
+            self._dispatch(job, index)
+
+    def _post(self, job: PostJob, index: int) -> None:
+        text = job.results[index]["tweet"]
+        try:
+            with observe("x", "create_tweet") as span:
+                try:
+                    response = self.client.create_tweet(text=text)
+                except tweepy.TooManyRequests:
+                    span["outcome"] = "rate_limited"
+                    raise
+            headers = getattr(response, "headers", None)
+            if headers is not None:
+                # requests.Response (return_type=requests.Response)
+                self.bucket.update(headers)
+                response.raise_for_status()
+                tweet_id = response.json()["data"]["id"]
+            else:
+                tweet_id = response.data["id"]
+            job._set(index, status="posted", id=tweet_id)
+        except tweepy.TooManyRequests as e:
+            headers = e.response.headers
+            self.bucket.update(headers)
+            self.bucket.exhaust(float(headers.get("x-rate-limit-reset", time.time() + self.bucket.window)))
+            self._defer(job, index, self.bucket.reset_at)
+        except Exception as e:
+            job._set(index, status="failed", error=str(e))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.assistant.utils.metrics import CACHE_LOOKUPS
+
+
+class SearchCache:
+    """
+    A two-tier response cache for Tavily searches.
+
+    Responses are keyed on the normalized request payload and kept in a bounded
+    in-memory LRU tier, optionally backed by a SQLite file so they survive
+    restarts and can be shared by several workers on one host.
+
+    Attributes:
+        max_entries (int): Maximum number of responses kept in memory
+        ttl (float): Seconds a response stays valid
+        news_ttl (float): Seconds a response stays valid for topic="news" searches
+        max_disk_entries (int): Maximum number of responses kept in SQLite
+        hits (int): Lookups served from either tier
+        misses (int): Lookups that had to go to the API
+    """
+
+    # Fields that change the response; everything else (e.g. the API key) is ignored
+    KEY_FIELDS = (
+        "query", "search_depth", "topic", "days", "time_range", "max_results", "include_images",
+        "include_image_descriptions", "include_answer", "include_raw_content", "include_domains",
+        "exclude_domains",
+    )
+    TIME_RANGES = {"d": "day", "w": "week", "m": "month", "y": "year"}
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 3600,
+        news_ttl: float = 600,
+        path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+    ) -> None:
+        """
+        Args:
+            max_entries (int, optional): Size of the in-memory tier. Defaults to 256
+            ttl (float, optional): Lifetime of general results in seconds. Defaults to 3600
+            news_ttl (float, optional): Lifetime of news results in seconds. Defaults to 600
+            path (str, optional): SQLite file for the on-disk tier. Defaults to None (memory only)
+            max_disk_entries (int, optional): Size of the on-disk tier. Defaults to 10000
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.news_ttl = news_ttl
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        # The memory tier is used on the event loop; SQLite work (which async
+        # lookups run in a worker thread) has its own lock so it never holds up the memory tier
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def key(self, payload: Dict) -> str:
+        """
+        Build the cache key for a request payload.
+
+        The query is case-folded and whitespace-collapsed, domain lists are
+        sorted and time_range abbreviations are expanded, so equivalent
+        searches share an entry.
+
+        Args:
+            payload (Dict): The Tavily request body
+
+        Returns:
+            str: Hex digest identifying the search
+        """
+        normalized = {field: payload.get(field) for field in self.KEY_FIELDS}
+        normalized["query"] = " ".join(str(normalized["query"] or "").lower().split())
+        if normalized["time_range"]:
+            time_range = normalized["time_range"].lower()
+            normalized["time_range"] = self.TIME_RANGES.get(time_range, time_range)
+        for field in ("include_domains", "exclude_domains"):
+            if normalized[field]:
+                normalized[field] = sorted(domain.lower() for domain in normalized[field])
+        encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, payload: Dict) -> Optional[Dict]:
+        """
+        Look up a cached response.
+
+        Args:
+            payload (Dict): The Tavily request body
+
+        Returns:
+            Dict: A fresh copy of the cached response, or None on a miss or expired entry
+        """
+        key = self.key(payload)
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = self._get_disk(key, now)
+        return self._found(value)
+
+    async def aget(self, payload: Dict) -> Optional[Dict]:
+        """
+        Like get, but reads the SQLite tier in a worker thread instead of on the event loop.
+        """
+        key = self.key(payload)
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._get_disk, key, now)
+        return self._found(value)
+
+    def set(self, payload: Dict, value: Dict) -> None:
+        """
+        Store a response.
+
+        Args:
+            payload (Dict): The Tavily request body
+            value (Dict): The response to cache
+        """
+        key, encoded, expires_at, now = self._entry(payload, value)
+        with self._lock:
+            self._remember(key, encoded, expires_at)
+        if self._db is not None:
+            self._set_disk(key, encoded, expires_at, now)
+
+    async def aset(self, payload: Dict, value: Dict) -> None:
+        """
+        Like set, but writes the SQLite tier in a worker thread instead of on the event loop.
+        """
+        key, encoded, expires_at, now = self._entry(payload, value)
+        with self._lock:
+            self._remember(key, encoded, expires_at)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, encoded, expires_at, now)
+
+    def _entry(self, payload: Dict, value: Dict) -> tuple:
+        now = time.time()
+        expires_at = now + (self.news_ttl if payload.get("topic") == "news" else self.ttl)
+        # Kept serialized, so neither the caller's dict nor later lookups can change the cached copy
+        return self.key(payload), json.dumps(value), expires_at, now
+
+    def _found(self, encoded: Optional[str]) -> Optional[Dict]:
+        if encoded is None:
+            with self._lock:
+                self.misses += 1
+            CACHE_LOOKUPS.inc("search", "miss")
+            return None
+        return json.loads(encoded)
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            encoded, expires_at = entry
+            if expires_at <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.memory_hits += 1
+        CACHE_LOOKUPS.inc("search", "memory_hit")
+        return encoded
+
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            self._db.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        with self._lock:
+            self._remember(key, row[0], row[1])
+            self.hits += 1
+            self.disk_hits += 1
+        CACHE_LOOKUPS.inc("search", "disk_hit")
+        return row[0]
+
+    def _set_disk(self, key: str, encoded: str, expires_at: float, now: float) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, encoded, expires_at, now),
+            )
+            self._evict_disk(now)
+            self._db.commit()
+
+    def _remember(self, key: str, encoded: str, expires_at: float) -> None:
+        self._memory[key] = (encoded, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now: float) -> None:
+        self._db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM search_cache WHERE key IN ("
+            "SELECT key FROM search_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    def clear(self) -> None:
+        """
+        Drop every cached response from both tiers.
+        """
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Hit/miss counters and the overall hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
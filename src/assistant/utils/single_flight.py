@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional
+
+from src.assistant.utils.metrics import SINGLE_FLIGHT
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Reduce a research topic to the form used to spot duplicates: case-folded,
+    whitespace collapsed and a trailing "?", "!" or "." dropped, so "AI agents",
+    " ai  agents " and "AI Agents!" are one topic. Other punctuation is kept,
+    since it can be the topic itself ("C++", "C#", ".NET").
+    """
+    return " ".join(topic.casefold().split()).rstrip("?!.").rstrip()
+
+
+class _Flight:
+    """The events of one shared run so far, and whether it has ended."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.events: List[Any] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def _notify(self) -> None:
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    async def run(self, source: AsyncIterator) -> None:
+        try:
+            async for item in source:
+                self.events.append(item)
+                self._notify()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.done = True
+            self.finished_at = time.monotonic()
+            self._notify()
+
+    async def follow(self) -> AsyncIterator:
+        position = 0
+        while True:
+            changed = self.changed
+            while position < len(self.events):
+                yield self.events[position]
+                position += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await changed.wait()
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent async streams into one.
+
+    The first caller for a key starts the stream in a background task; callers
+    that arrive while it runs, or up to ``window`` seconds after it finished,
+    get every item it produced so far and then the rest as it arrives. The
+    underlying work runs once however many callers there are, and keeps running
+    if the caller that started it goes away.
+
+    Attributes:
+        window (float): Seconds a finished stream is still handed to new callers;
+            0 shares a stream only while it runs
+        enabled (bool): When False every caller gets its own stream
+    """
+
+    def __init__(self, window: float = 0.0, enabled: bool = True) -> None:
+        self.window = window
+        self.enabled = enabled
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key, flight in list(self._flights.items()):
+            if flight.done and (flight.error is not None or now - flight.finished_at > self.window):
+                del self._flights[key]
+
+    def stream(self, key: Hashable, factory: Callable[[], AsyncIterator]) -> AsyncIterator:
+        """
+        Args:
+            key (Hashable): Identifies equivalent work
+            factory (Callable[[], AsyncIterator]): Starts the work; only called for the first caller
+
+        Returns:
+            AsyncIterator: The shared items, from the first one
+        """
+        if not self.enabled:
+            return factory()
+        self._evict()
+        flight = self._flights.get(key)
+        # asyncio primitives belong to one event loop; other loops (e.g. job workers) start their own
+        if flight is not None and flight.loop is asyncio.get_running_loop():
+            SINGLE_FLIGHT.inc("follower")
+            return flight.follow()
+        flight = _Flight()
+        flight.task = asyncio.create_task(flight.run(factory()))
+        self._flights[key] = flight
+        SINGLE_FLIGHT.inc("leader")
+        return flight.follow()
@@ -0,0 +1,138 @@
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click and never change the page. Names
+# are matched exactly, so e.g. "refid" or "reference" are kept; only the utm_
+# family is matched by prefix
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid"})
+TRACKING_PREFIXES = ("utm_",)
+
+
+def _is_tracking(key: str) -> bool:
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL so that trivially different links to one page compare equal.
+
+    Treats http and https alike, lower-cases the host, drops ``www.``, the fragment, tracking
+    parameters and a trailing slash, and sorts the remaining query parameters.
+
+    Args:
+        url (str): The URL as returned by the search API
+
+    Returns:
+        str: The canonical form
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(key)
+    )
+    scheme = parts.scheme.lower()
+    if scheme in ("", "http"):
+        scheme = "https"
+    return urlunsplit((scheme, host, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+def content_hash(text: Optional[str]) -> Optional[str]:
+    """
+    Hash page content after collapsing whitespace and case, so mirrors and
+    syndicated copies of an article hash the same.
+
+    Returns:
+        str: Hex digest, or None for empty content
+    """
+    normalized = re.sub(r"\s+", " ", (text or "")).strip().lower()
+    if not normalized:
+        return None
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class SourceIndex:
+    """
+    The sources a research run has already gathered, keyed by canonical URL and content hash.
+
+    Attributes:
+        urls (set): Canonical URLs seen so far
+        hashes (set): Content hashes seen so far
+    """
+
+    def __init__(self) -> None:
+        self.urls = set()
+        self.hashes = set()
+
+    @classmethod
+    def from_sources(cls, sources: Iterable[Dict]) -> "SourceIndex":
+        """
+        Build an index from previously gathered search results.
+        """
+        index = cls()
+        for source in sources:
+            index.add(source)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def seen(self, source: Dict) -> bool:
+        """Whether a search result duplicates a gathered source by URL or by content."""
+        if source.get("url") and canonical_url(source["url"]) in self.urls:
+            return True
+        digest = content_hash(source.get("content"))
+        return digest is not None and digest in self.hashes
+
+    def add(self, source: Dict) -> None:
+        if source.get("url"):
+            self.urls.add(canonical_url(source["url"]))
+        digest = content_hash(source.get("content"))
+        if digest is not None:
+            self.hashes.add(digest)
+
+    def filter(self, sources: Iterable[Dict]) -> List[Dict]:
+        """
+        Keep only unseen search results and add them to the index.
+
+        Duplicates within ``sources`` itself are dropped too; the first occurrence wins.
+
+        Args:
+            sources (Iterable[Dict]): Search results in priority order
+
+        Returns:
+            List[Dict]: The new results
+        """
+        fresh = []
+        for source in sources:
+            if not self.seen(source):
+                self.add(source)
+                fresh.append(source)
+        return fresh
+
+
+def _terms(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]{4,}", (text or "").lower()))
+
+
+def term_novelty(new_texts: Iterable[str], known_texts: Iterable[str]) -> float:
+    """
+    Share of the distinct terms in new material that appear nowhere in what is already known.
+
+    Args:
+        new_texts (Iterable[str]): Content of the newly gathered sources
+        known_texts (Iterable[str]): The running summary and earlier sources
+
+    Returns:
+        float: 0.0 (nothing new, or no new material at all) to 1.0 (all new)
+    """
+    new_terms = set().union(*(_terms(text) for text in new_texts))
+    if not new_terms:
+        return 0.0
+    known_terms = set().union(*(_terms(text) for text in known_texts))
+    return len(new_terms - known_terms) / len(new_terms)
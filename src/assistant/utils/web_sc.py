@@ -1,5 +1,10 @@
+import os
+import httpx
 import requests
 from typing import List,Dict,Optional,Union
+from src.assistant.utils.search_cache import SearchCache
+from src.assistant.utils.http_client import get_async_client, get_session
+from src.assistant.utils.metrics import observe
 
 class TavilySearchAPI:
 
@@ -9,13 +14,29 @@ class TavilySearchAPI:
     Attributes:
         __api_key (str): Private API key for authentication
         __base_url (str): Private base URL for the API endpoint
+        cache (SearchCache): Optional response cache consulted before each request
+        session (requests.Session): Pooled session for sync requests; the shared one by default
+        async_client (httpx.AsyncClient): Pooled client for async requests; the shared one by default
+        base_url (str): API host; TAVILY_BASE_URL or https://api.tavily.com by default
     """
 
-    def __init__(self,api_key) -> None:
+    def __init__(
+        self,
+        api_key,
+        cache: Optional[SearchCache] = None,
+        session: Optional[requests.Session] = None,
+        async_client: Optional[httpx.AsyncClient] = None,
+        base_url: Optional[str] = None,
+    ) -> None:
         self.__api_key = api_key
-        self.__base_url = "https://api.tavily.com/search"
+        # TAVILY_BASE_URL points the client at another host, e.g. the benchmark stand-in
+        base_url = base_url or os.getenv("TAVILY_BASE_URL", "https://api.tavily.com")
+        self.__base_url = base_url.rstrip("/") + "/search"
+        self.cache = cache
+        self.session = session
+        self.async_client = async_client
 
-    def search(
+    def _build_payload(
         self,
         query: str,
         search_depth: str = "basic",
@@ -31,6 +52,8 @@ class TavilySearchAPI:
         exclude_domains: Optional[List[str]] = None
     ) -> Dict:
         """
+        Validate the search arguments and build the Tavily request body.
+
          Args:
             query (str): The search query
             search_depth (str, optional): "basic" or "advanced". Defaults to "basic"
@@ -78,23 +101,108 @@ class TavilySearchAPI:
             
         if exclude_domains:
             payload["exclude_domains"] = exclude_domains
-        
+
+        return payload
+
+    def search(
+        self,
+        query: str,
+        search_depth: str = "basic",
+        topic: str = "general",
+        days: Optional[int] = None,
+        time_range: Optional[str] = None,
+        max_results: int = 5,
+        include_images: bool = False,
+        include_image_descriptions: bool = False,
+        include_answer: bool = False,
+        include_raw_content: bool = False,
+        include_domains: Optional[List[str]] = None,
+        exclude_domains: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Search the Tavily API. Takes the same arguments as _build_payload.
+
+        Returns:
+            Dict: The search results
+        """
+        payload = self._build_payload(
+            query, search_depth, topic, days, time_range, max_results, include_images,
+            include_image_descriptions, include_answer, include_raw_content, include_domains, exclude_domains
+        )
+        if self.cache is not None:
+            cached = self.cache.get(payload)
+            if cached is not None:
+                return cached
 
         try:
             headers = {
                 "Content-Type": "application/json"
             }
-            response = requests.post(
-                self.__base_url,
-                json=payload,
-                headers=headers
-            )
-            response.raise_for_status()
-            return response.json()
+            with observe("tavily", "search"):
+                response = (self.session or get_session(retry_post=True)).post(
+                    self.__base_url,
+                    json=payload,
+                    headers=headers
+                )
+                response.raise_for_status()
+            result = response.json()
+            if self.cache is not None:
+                self.cache.set(payload, result)
+            return result
             
         except requests.exceptions.RequestException as e:
             raise requests.exceptions.RequestException(f"Tavily API request failed: {str(e)}")
 
+    async def asearch(
+        self,
+        query: str,
+        search_depth: str = "basic",
+        topic: str = "general",
+        days: Optional[int] = None,
+        time_range: Optional[str] = None,
+        max_results: int = 5,
+        include_images: bool = False,
+        include_image_descriptions: bool = False,
+        include_answer: bool = False,
+        include_raw_content: bool = False,
+        include_domains: Optional[List[str]] = None,
+        exclude_domains: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Search the Tavily API without blocking the event loop. Takes the same
+        arguments as _build_payload.
+
+        Returns:
+            Dict: The search results
+        """
+        payload = self._build_payload(
+            query, search_depth, topic, days, time_range, max_results, include_images,
+            include_image_descriptions, include_answer, include_raw_content, include_domains, exclude_domains
+        )
+        if self.cache is not None:
+            cached = await self.cache.aget(payload)
+            if cached is not None:
+                return cached
+
+        try:
+            headers = {
+                "Content-Type": "application/json"
+            }
+            with observe("tavily", "search"):
+                response = await (self.async_client or get_async_client(retry_post=True)).post(
+                    self.__base_url,
+                    json=payload,
+                    headers=headers
+                )
+                response.raise_for_status()
+            result = response.json()
+            if self.cache is not None:
+                await self.cache.aset(payload, result)
+            return result
+
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(f"Tavily API request failed: {str(e)}")
+
     def format_llm(self, results: Dict) -> str:
 
         """
@@ -131,4 +239,30 @@ class TavilySearchAPI:
                     result += f"   Published Date: {res['published_date']}\n"
                 result += f"\n   Content: {res.get('content', 'No content')}\n"
                 
-        return result   
\ No newline at end of file
+        return result   
+
+    def merge_results(self, responses: List[Dict]) -> Dict:
+        """
+        Merge the responses of several searches into one response.
+
+        Results found by more than one query are kept once, with their best
+        score, and the merged list is ordered by score.
+
+        Args:
+            responses (List[Dict]): Search results from the Tavily API
+
+        Returns:
+            Dict: A response shaped like a single search, ready for format_llm
+        """
+        if len(responses) == 1:
+            return responses[0]
+        merged: Dict[str, Dict] = {}
+        for response in responses:
+            for res in response.get('results', []):
+                key = res.get('url') or res.get('title')
+                if key not in merged or res.get('score', 0) > merged[key].get('score', 0):
+                    merged[key] = res
+        return {
+            'query': " | ".join(response['query'] for response in responses),
+            'results': sorted(merged.values(), key=lambda res: res.get('score', 0), reverse=True),
+        }
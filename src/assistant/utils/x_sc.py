@@ -1,10 +1,37 @@
 import tweepy
+import requests
 from dotenv import load_dotenv
+import logging
 import os
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# tweepy sends every v2 request to this host
+TWITTER_HOST = "https://api.twitter.com"
+
+
+class RebasedSession(requests.Session):
+    """
+    A session that sends tweepy's requests to another host, e.g. the benchmark
+    stand-in, since tweepy has no option for the API host.
+
+    Attributes:
+        base_url (str): Replaces TWITTER_HOST at the start of every URL
+    """
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method, url, *args, **kwargs):
+        if url.startswith(TWITTER_HOST):
+            url = self.base_url + url[len(TWITTER_HOST):]
+        return super().request(method, url, *args, **kwargs)
+
+
 # Define a configuration class to store API keys and tokens
 class TwitterAPIConfig:
     """
@@ -53,12 +80,14 @@ class TwitterAPIClient:
         client (tweepy.Client): A Tweepy client instance for API v2.
     """
 
-    def __init__(self, config):
+    def __init__(self, config, wait_on_rate_limit=True, **client_kwargs):
         """
         Initializes the TwitterAPIClient with the given configuration.
 
         Args:
             config (TwitterAPIConfig): The configuration object containing API credentials.
+            wait_on_rate_limit (bool): Whether tweepy should sleep when rate limited.
+            **client_kwargs: Extra keyword arguments for tweepy.Client, e.g. return_type.
         """
         self.client = tweepy.Client(
             access_token=config.access_token,
@@ -66,8 +95,12 @@ class TwitterAPIClient:
             consumer_key=config.consumer_key,
             consumer_secret=config.consumer_secret,
             bearer_token=config.bearer_token,
-            wait_on_rate_limit=True
+            wait_on_rate_limit=wait_on_rate_limit,
+            **client_kwargs
         )
+        # X_API_BASE points the client at another host, e.g. the benchmark stand-in
+        if os.getenv("X_API_BASE"):
+            self.client.session = RebasedSession(os.environ["X_API_BASE"])
 
     def get_client(self):
         """
@@ -106,5 +139,23 @@ def initialize_twitter_client():
         client = TwitterAPIClient(config)  # Create client
         return client.get_client(), client.v1_api(config)  # Return the Tweepy client
     except ValueError as e:
-        print(f"Error initializing Twitter client: {e}")
+        logger.error("Error initializing Twitter client: %s", e)
         return None
+
+
+def initialize_posting_client():
+    """
+    Initializes a Tweepy client for the post scheduler.
+
+    Unlike initialize_twitter_client, the client raises on rate limits instead of
+    sleeping, and returns raw requests.Response objects so the scheduler can read
+    the rate-limit headers.
+
+    Returns:
+        tweepy.Client: The Tweepy client for API v2.
+
+    Raises:
+        ValueError: If any of the API credentials are missing.
+    """
+    config = TwitterAPIConfig()
+    return TwitterAPIClient(config, wait_on_rate_limit=False, return_type=requests.Response).get_client()
@@ -0,0 +1,137 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessageChunk
+
+from benchmarks.stubs import FakeChatModel, FakeSearchAPI
+from src.assistant.deps import ChatModels, deps
+from src.assistant.events import TokenStream
+
+X_AGENT = {"langgraph_node": "x_agent"}
+
+# Valid JSON whose second tweet fails validation (empty content), so x_agent re-asks
+REJECTED = json.dumps({"tweets": [{"content": "Rejected tweet", "virality_score": 5}, {"content": ""}]})
+
+
+def tweets(*contents):
+    return json.dumps({"tweets": [{"content": content, "virality_score": 5} for content in contents]})
+
+
+def stream(tokens, text, run_id, size=7):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(tokens.feed(AIMessageChunk(content=text[i:i + size], id=run_id), X_AGENT))
+    return events
+
+
+def test_items_stream_once():
+    tokens = TokenStream()
+    streamed = stream(tokens, tweets("a", "b"), "run-1")
+    assert [data["content"] for _, data in streamed] == ["a", "b"]
+
+    final = [{"content": "a", "virality_score": 5.0, "justification": ""},
+             {"content": "b", "virality_score": 5.0, "justification": ""}]
+    assert list(tokens.reconcile({"x_agent": {"tweets": final}})) == []
+
+
+def test_reask_discards_rejected_items():
+    tokens = TokenStream()
+    events = stream(tokens, REJECTED, "run-1")
+    # The accepted reply comes from a second LLM run of the same node
+    events += stream(tokens, tweets("b", "c"), "run-2")
+    final = [{"content": "b", "virality_score": 5.0}, {"content": "c", "virality_score": 5.0}]
+    events += list(tokens.reconcile({"x_agent": {"tweets": final}}))
+
+    assert [event for event, _ in events] == ["tweet", "tweet", "discard", "tweet", "tweet"]
+    assert events[2][1] == {"event": "tweet", "items": [{"content": "Rejected tweet", "virality_score": 5}, {"content": ""}]}
+    assert [data["content"] for _, data in events[3:]] == ["b", "c"]
+
+
+def test_items_missing_from_output_are_discarded():
+    tokens = TokenStream()
+    stream(tokens, tweets("a", "b"), "run-1")
+    events = list(tokens.reconcile({"x_agent": {"tweets": [{"content": "b"}, {"content": "c"}]}}))
+    assert events == [("discard", {"event": "tweet", "items": [{"content": "a", "virality_score": 5}]}),
+                      ("tweet", {"content": "c"})]
+
+
+class RejectFirstTweets(FakeChatModel):
+    """Streams REJECTED the first time it writes tweets, then the canned tweets."""
+
+    rejected: bool = False
+
+    def _chunks(self, messages):
+        chunks = super()._chunks(messages)
+        if "X_Agent" in messages[0].content and not self.rejected:
+            self.rejected = True
+            return [REJECTED[i:i + self.chunk_chars] for i in range(0, len(REJECTED), self.chunk_chars)]
+        return chunks
+
+
+def test_reask_through_the_graph():
+    from src.assistant.runs import run_research
+
+    deps.override(
+        chat_models=ChatModels(lambda model: RejectFirstTweets(latency=0, model_name=model, cache=False)),
+        search_api=FakeSearchAPI(latency=0),
+    )
+
+    async def collect():
+        return [item async for item in run_research("AI agents", stream_tokens=True, max_research_loops=1)]
+
+    try:
+        events = asyncio.run(collect())
+    finally:
+        deps.reset("chat_models", "search_api")
+
+    names = [event for event, _ in events]
+    tweets_out = [data["content"] for event, data in events if event == "tweet"]
+    discards = [data for event, data in events if event == "discard"]
+    final = next(data["tweets"] for event, data in events if event == "done")
+
+    assert discards == [{"event": "tweet", "items": [{"content": "Rejected tweet", "virality_score": 5}, {"content": ""}]}]
+    assert names.index("discard") == 2 + names.index("tweet")
+    # Every accepted tweet was emitted exactly once, after the discard
+    accepted = tweets_out[2:]
+    assert accepted == [tweet["content"] for tweet in final]
+    assert len(set(accepted)) == len(accepted) == 10
+
+
+class BareTweets(FakeChatModel):
+    """Writes tweets with only content and score, leaving justification to the schema default."""
+
+    def _chunks(self, messages):
+        chunks = super()._chunks(messages)
+        if "X_Agent" in messages[0].content:
+            bare = tweets(*(f"Bare tweet {i}" for i in range(10)))
+            return [bare[i:i + self.chunk_chars] for i in range(0, len(bare), self.chunk_chars)]
+        return chunks
+
+    def _message(self, messages):
+        message = super()._message(messages)
+        if "X_Agent" in messages[0].content:
+            message.content = tweets(*(f"Bare tweet {i}" for i in range(10)))
+        return message
+
+
+def test_done_is_validated_whether_streamed_or_not():
+    from src.assistant.runs import run_research
+
+    deps.override(
+        chat_models=ChatModels(lambda model: BareTweets(latency=0, model_name=model, cache=False)),
+        search_api=FakeSearchAPI(latency=0),
+    )
+
+    async def done(stream_tokens):
+        async for event, data in run_research("AI agents", stream_tokens=stream_tokens, max_research_loops=1):
+            if event == "done":
+                return data
+
+    try:
+        streamed, blocking = asyncio.run(done(True)), asyncio.run(done(False))
+    finally:
+        deps.reset("chat_models", "search_api")
+
+    assert streamed["tweets"] == blocking["tweets"]
+    assert len(streamed["tweets"]) == 10
+    assert all(tweet["justification"] == "" for tweet in streamed["tweets"])
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from src.assistant.state import Tweets
+from src.assistant.structured import StructuredOutputError, parse_reply
+from src.assistant.utils.json_repair import loads_lenient, repair_candidates
+
+REPLY = '{"tweets": [{"content": "First", "virality_score": 7}, {"content": "Second", "virality_score": 6}]}'
+
+
+def test_valid_json_is_the_first_candidate():
+    assert json.loads(next(repair_candidates(REPLY))) == json.loads(REPLY)
+
+
+def test_truncated_reply_keeps_the_complete_items():
+    truncated = '{"tweets": [{"content": "First", "virality_score": 7}, {"content": "Sec'
+    assert parse_reply(truncated, Tweets).tweets[0].content == "First"
+    assert len(parse_reply(truncated, Tweets).tweets) == 1
+
+
+def test_trailing_commas_are_dropped():
+    text = '{"tweets": [{"content": "First", "virality_score": 7,}, {"content": "Second",},],}'
+    assert [tweet.content for tweet in parse_reply(text, Tweets).tweets] == ["First", "Second"]
+
+
+def test_code_fences_are_stripped():
+    assert loads_lenient(f"```json\n{REPLY}\n```") == json.loads(REPLY)
+    assert loads_lenient(f"```\n{REPLY}") == json.loads(REPLY)
+
+
+@pytest.mark.parametrize("text", [
+    f"Here you go: {REPLY}",
+    f"{REPLY} hope it helps",
+    f"Here you go: {REPLY} hope it helps {{not json}}",
+    f"Sure!\n```json\n{REPLY}\n```\nLet me know if you want more [options].",
+])
+def test_surrounding_prose_is_dropped(text):
+    assert loads_lenient(text) == json.loads(REPLY)
+
+
+def test_brackets_inside_strings_do_not_end_the_reply():
+    text = '{"tweets": [{"content": "Use {braces} and [brackets]}"}]} thanks'
+    assert parse_reply(text, Tweets).tweets[0].content == "Use {braces} and [brackets]}"
+
+
+@pytest.mark.parametrize("score, expected", [("8", 8.0), ("8/10", 8.0), ("7.5 out of 10", 7.5), ("high", None)])
+def test_non_numeric_virality_score_does_not_fail_the_reply(score, expected):
+    text = json.dumps({"tweets": [{"content": "First", "virality_score": score}]})
+    assert parse_reply(text, Tweets).tweets[0].virality_score == expected
+
+
+def test_unrepairable_reply_raises():
+    with pytest.raises(StructuredOutputError):
+        parse_reply("I can't help with that.", Tweets)
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from typing import TypedDict
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langgraph.graph import END, START, StateGraph
+
+from benchmarks.stubs import FakeChatModel
+from src.assistant.state import Tweets
+from src.assistant.structured import ainvoke_structured, invoke_structured
+from src.assistant.utils.llm_cache import ResponseCache
+
+TOPICS = ("healthcare", "rust", "kernel")
+
+
+def topic_vector(prompt: str):
+    # Counts a few topic words, so case and punctuation changes embed identically
+    return [prompt.lower().count(word) for word in TOPICS]
+
+
+def model(cache: ResponseCache) -> FakeChatModel:
+    return FakeChatModel(latency=0, cache=cache)
+
+
+def ask(llm: FakeChatModel, topic: str) -> str:
+    return llm.invoke([HumanMessage(content=f"Summarize {topic}")]).content
+
+
+def test_exact_hit():
+    llm = model(ResponseCache())
+    first = ask(llm, "AI in healthcare")
+    assert ask(llm, "AI in healthcare") == first
+    assert llm.calls == 1
+    ask(llm, "AI in finance")
+    assert llm.calls == 2
+
+
+def test_exact_tier_keys_on_model():
+    cache = ResponseCache()
+    ask(FakeChatModel(latency=0, cache=cache, model_name="large"), "AI in healthcare")
+    other = FakeChatModel(latency=0, cache=cache, model_name="small")
+    ask(other, "AI in healthcare")
+    assert other.calls == 1
+
+
+def test_similarity_hit():
+    llm = model(ResponseCache(embed=topic_vector, similarity_threshold=0.99))
+    ask(llm, "AI in healthcare")
+    ask(llm, "AI in HEALTHCARE!")
+    assert llm.calls == 1
+    assert llm.cache.stats()["unknown"]["similar_hits"] == 1
+
+
+def test_similarity_miss():
+    llm = model(ResponseCache(embed=topic_vector, similarity_threshold=0.99))
+    ask(llm, "AI in healthcare")
+    ask(llm, "Rust in the Linux kernel")
+    assert llm.calls == 2
+    assert llm.cache.stats()["unknown"]["similar_hits"] == 0
+
+
+def test_ttl_expiry():
+    llm = model(ResponseCache(ttl=0.05))
+    ask(llm, "AI in healthcare")
+    ask(llm, "AI in healthcare")
+    assert llm.calls == 1
+    time.sleep(0.1)
+    ask(llm, "AI in healthcare")
+    assert llm.calls == 2
+
+
+def test_lru_eviction():
+    llm = model(ResponseCache(max_entries=2))
+    ask(llm, "a")
+    ask(llm, "b")
+    ask(llm, "a")  # a is now the most recently used
+    ask(llm, "c")  # evicts b
+    assert llm.calls == 3
+    ask(llm, "a")
+    assert llm.calls == 3
+    ask(llm, "b")
+    assert llm.calls == 4
+
+
+class _State(TypedDict, total=False):
+    topic: str
+
+
+def test_per_node_stats():
+    llm = model(ResponseCache())
+    builder = StateGraph(_State)
+    builder.add_node("summarizer", lambda state: ask(llm, state["topic"]) and {})
+    builder.add_node("reflection", lambda state: ask(llm, "gaps in " + state["topic"]) and {})
+    builder.add_edge(START, "summarizer")
+    builder.add_edge("summarizer", "reflection")
+    builder.add_edge("reflection", END)
+    graph = builder.compile()
+
+    graph.invoke({"topic": "AI in healthcare"})
+    graph.invoke({"topic": "AI in healthcare"})
+
+    stats = llm.cache.stats()
+    assert set(stats) == {"summarizer", "reflection"}
+    for node in ("summarizer", "reflection"):
+        assert stats[node]["hits"] == 1
+        assert stats[node]["misses"] == 1
+        assert stats[node]["hit_rate"] == 0.5
+
+
+class BrokenOnceChatModel(FakeChatModel):
+    """Replies with invalid JSON the first ``broken`` times, then with the canned reply."""
+
+    broken: int = 1
+
+    def _message(self, messages):
+        message = super()._message(messages)
+        if self.broken:
+            self.broken -= 1
+            message.content = '{"tweets": "not a list"}'
+        return message
+
+
+def test_invalid_structured_reply_is_not_cached():
+    llm = BrokenOnceChatModel(latency=0, cache=ResponseCache())
+    messages = [SystemMessage(content="You are X_Agent"), HumanMessage(content="Write tweets")]
+
+    payload, _ = invoke_structured(llm, messages, Tweets)
+    assert payload.tweets
+    assert llm.calls == 2  # the invalid reply and the re-ask
+
+    # The rejected reply was not cached, so the same prompt asks the model again...
+    invoke_structured(llm, messages, Tweets)
+    assert llm.calls == 3
+    # ...and the valid reply it got is
+    invoke_structured(llm, messages, Tweets)
+    assert llm.calls == 3
+
+
+def test_invalid_structured_reply_is_not_cached_async():
+    llm = BrokenOnceChatModel(latency=0, cache=ResponseCache())
+    messages = [SystemMessage(content="You are X_Agent"), HumanMessage(content="Write tweets")]
+
+    async def run():
+        for _ in range(3):
+            await ainvoke_structured(llm, messages, Tweets)
+
+    asyncio.run(run())
+    assert llm.calls == 3
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from src.assistant.utils.single_flight import SingleFlight, normalize_topic
+
+
+class Source:
+    """Counts runs and yields `items`, pausing between them so followers can join mid-stream."""
+
+    def __init__(self, items=("a", "b", "c"), error=None, pause=0.01):
+        self.items = items
+        self.error = error
+        self.pause = pause
+        self.runs = 0
+
+    async def __call__(self):
+        self.runs += 1
+        for item in self.items:
+            await asyncio.sleep(self.pause)
+            yield item
+        if self.error is not None:
+            raise self.error
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+@pytest.mark.parametrize("a, b", [
+    ("AI agents", " ai  agents "),
+    ("AI agents", "AI Agents!"),
+    ("AI agents", "ai agents?"),
+    ("Rust async.", "rust ASYNC"),
+])
+def test_normalize_topic_folds_case_whitespace_and_trailing_punctuation(a, b):
+    assert normalize_topic(a) == normalize_topic(b)
+
+
+def test_normalize_topic_keeps_meaningful_punctuation():
+    assert len({normalize_topic(topic) for topic in ("C++", "C#", "C")}) == 3
+    assert normalize_topic(".NET") == ".net"
+    assert normalize_topic("Node.js") == "node.js"
+
+
+def test_followers_replay_the_leaders_events():
+    source = Source()
+    flights = SingleFlight()
+
+    async def main():
+        leader = asyncio.create_task(collect(flights.stream("k", source)))
+        await asyncio.sleep(0.015)  # the leader has produced "a" by now
+        follower = await collect(flights.stream("k", source))
+        return await leader, follower
+
+    leader, follower = asyncio.run(main())
+    assert leader == follower == ["a", "b", "c"]
+    assert source.runs == 1
+
+
+def test_errors_reach_every_caller_and_are_not_shared_afterwards():
+    source = Source(error=RuntimeError("boom"))
+    flights = SingleFlight(window=60)
+
+    async def main():
+        results = await asyncio.gather(*(collect(flights.stream("k", source)) for _ in range(3)), return_exceptions=True)
+        # the failed flight is evicted at once despite the window, so this starts a new run
+        retry = await asyncio.gather(collect(flights.stream("k", source)), return_exceptions=True)
+        return results + retry
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert source.runs == 2
+
+
+def test_finished_flights_expire_after_the_window():
+    source = Source(pause=0)
+    flights = SingleFlight(window=0.05)
+
+    async def main():
+        first = await collect(flights.stream("k", source))
+        within = await collect(flights.stream("k", source))
+        assert source.runs == 1
+        await asyncio.sleep(0.1)
+        after = await collect(flights.stream("k", source))
+        return first, within, after
+
+    first, within, after = asyncio.run(main())
+    assert first == within == after == ["a", "b", "c"]
+    assert source.runs == 2
+
+
+def test_each_event_loop_starts_its_own_flight():
+    source = Source(pause=0)
+    flights = SingleFlight(window=60)
+
+    async def main():
+        return await collect(flights.stream("k", source))
+
+    assert asyncio.run(main()) == ["a", "b", "c"]
+    assert asyncio.run(main()) == ["a", "b", "c"]
+    assert source.runs == 2
+
+
+def test_disabled_runs_every_caller():
+    source = Source()
+    flights = SingleFlight(window=60, enabled=False)
+
+    async def main():
+        return await asyncio.gather(*(collect(flights.stream("k", source)) for _ in range(3)))
+
+    assert asyncio.run(main()) == [["a", "b", "c"]] * 3
+    assert source.runs == 3